@@ -0,0 +1,17 @@
+"""
+Gunicorn configuration.
+
+For Prometheus metrics across workers, start gunicorn with
+PROMETHEUS_MULTIPROC_DIR pointing at an empty directory, e.g.:
+
+    rm -rf /tmp/metrics && mkdir /tmp/metrics
+    PROMETHEUS_MULTIPROC_DIR=/tmp/metrics gunicorn movie_booking_project.wsgi
+"""
+import os
+
+
+def child_exit(server, worker):
+    """Drop an exited worker's live metrics from the shared store."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
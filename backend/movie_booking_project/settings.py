@@ -8,6 +8,8 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
+from decouple import Csv, config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -39,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the rest of the stack
+    'movies.middleware.RequestTimingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -70,13 +74,136 @@ TEMPLATES = [
 WSGI_APPLICATION = 'movie_booking_project.wsgi.application'
 
 # Database
-DATABASES = {
+#
+# DB_ENGINE selects the backend: 'sqlite' (default, for development and
+# single-node venues) or 'postgresql'. Values are read from the environment
+# or a .env file next to manage.py.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+
+# SQLite profile for single-node venues. SQLITE_PROFILE=tuned enables WAL so
+# readers never block the writer, waits up to 20s for the write lock instead
+# of failing with "database is locked", and starts every transaction with
+# BEGIN IMMEDIATE so concurrent bookings queue for the write lock up front
+# (SQLite ignores select_for_update). Opt-in: WAL is recorded in the database
+# file itself and leaves -wal/-shm files next to it, so the default keeps
+# SQLite's stock behaviour and leaves the checked-in db.sqlite3 untouched.
+SQLITE_PROFILE = config('SQLITE_PROFILE', default='default')
+
+SQLITE_TUNED_OPTIONS = {
+    'timeout': 20,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=134217728;'
+        'PRAGMA cache_size=-32000;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+}
+
+# PostgreSQL connections persist for DB_CONN_MAX_AGE seconds and are checked
+# before reuse, so requests skip the TCP and auth handshake. DB_POOL=true
+# switches to psycopg's connection pool instead (requires psycopg 3; Django
+# then closes connections back to the pool, so CONN_MAX_AGE is forced to 0).
+if DB_ENGINE == 'postgresql':
+    POSTGRES_OPTIONS = {}
+    if config('DB_POOL', default=False, cast=bool):
+        POSTGRES_OPTIONS['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='movie_booking'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': 0 if 'pool' in POSTGRES_OPTIONS else config('DB_CONN_MAX_AGE', default=60, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': POSTGRES_OPTIONS,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'OPTIONS': SQLITE_TUNED_OPTIONS if SQLITE_PROFILE == 'tuned' else {},
+        },
+        # A second local database for exercising the replica router without
+        # PostgreSQL (ReplicaDatabaseTest). Nothing copies data to it, and no
+        # read goes to it unless it is listed in DATABASE_REPLICAS.
+        'local_replica': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_LOCAL_REPLICA_NAME', default=str(BASE_DIR / 'db_replica.sqlite3')),
+        },
+    }
+
+# Read replicas for catalogue reads (PostgreSQL). DB_REPLICA_HOSTS lists
+# host[:port] entries that each become a 'replica_<n>' alias with the
+# primary's name and credentials; see movies/routers.py. After booking or
+# cancelling, a user's reads stay on the primary for REPLICA_STICKY_SECONDS.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(config('DB_REPLICA_HOSTS', default='', cast=Csv()), 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default'].get('PORT', ''),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['movies.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = config('REPLICA_STICKY_SECONDS', default=10, cast=int)
+# Lifetime of catalogue cache entries built from a replica: bounds how long a
+# lagging replica's rows can be served after an invalidation.
+REPLICA_CACHE_TIMEOUT = config('REPLICA_CACHE_TIMEOUT', default=10, cast=int)
+
+# Cache (catalogue listings). Local memory by default; point CACHE_BACKEND and
+# CACHE_LOCATION at a shared backend (e.g. file-based) so invalidations reach
+# every worker process.
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='movie-booking'),
     }
 }
 
+# Cache catalogue listings and per-show seat availability. Both are off with
+# the process-local default cache: a write only invalidates the cache of the
+# worker that made it, and the other workers would keep serving old listings
+# and availability until they expired.
+SHARED_CACHE = CACHE_BACKEND != 'django.core.cache.backends.locmem.LocMemCache'
+CATALOGUE_CACHE_LISTS = config('CATALOGUE_CACHE_LISTS', default=SHARED_CACHE, cast=bool)
+CATALOGUE_CACHE_SEATS = config('CATALOGUE_CACHE_SEATS', default=SHARED_CACHE, cast=bool)
+
+# Seconds a cached movie/show listing may be served before it is rebuilt
+CATALOGUE_CACHE_TIMEOUT = 300
+
+# Longest window the showtime calendar (GET /api/shows/calendar/) accepts
+SHOW_CALENDAR_MAX_DAYS = 31
+
+# Most show ids one availability request (GET /api/shows/availability/) may ask for
+SHOW_AVAILABILITY_MAX_IDS = 100
+
+# Most upcoming shows the movie page (GET /api/movies/<id>/page/) includes
+MOVIE_PAGE_MAX_SHOWS = 50
+
+# Real-time seat events (GET /api/shows/<id>/events/, Server-Sent Events).
+# The in-process broadcaster only reaches subscribers in the same process.
+SEAT_EVENTS_BACKEND = 'movies.events.InProcessBroadcaster'
+SEAT_EVENTS_HEARTBEAT_SECONDS = 15
+
+# Rows fetched per database round trip by booking exports
+# (GET /api/bookings/export/ and the export_bookings command)
+BOOKING_EXPORT_CHUNK_SIZE = config('BOOKING_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,10 +241,69 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'movies.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
 
+# Booking concurrency: 'locking' serializes bookings per show with
+# select_for_update; 'optimistic' relies on the unique constraint on booked
+# (show, seat_number) pairs and reports conflicts as "seat taken" without
+# retrying.
+BOOKING_STRATEGY = config('BOOKING_STRATEGY', default='locking')
+
+# Upper bound (milliseconds) on any single statement inside a booking
+# transaction, including waiting for the show row lock. Applied with
+# SET LOCAL on PostgreSQL; a timed-out booking is not retried but answered
+# with 503 and Retry-After. 0 disables the limit.
+BOOKING_STATEMENT_TIMEOUT_MS = config('BOOKING_STATEMENT_TIMEOUT_MS', default=5000, cast=int)
+
+# Retry policy for transient booking errors (lock not available, deadlocks,
+# serialization failures, SQLite "database is locked"). Backoff is jittered
+# and capped so workers are not parked in sleep; after the last attempt
+# clients get 503 with Retry-After.
+BOOKING_RETRY = {
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE_SECONDS': 0.01,
+    'BACKOFF_MAX_SECONDS': 0.05,
+    'RETRY_AFTER_SECONDS': 1,
+}
+
+# Request timing (movies/middleware.py): a Server-Timing header on every
+# response, and a JSON line on the movies.timing logger for a sample of
+# requests plus every request slower than SLOW_REQUEST_MS (with its SQL).
+REQUEST_TIMING = {
+    'SERVER_TIMING_HEADER': config('SERVER_TIMING_HEADER', default=True, cast=bool),
+    'SAMPLE_RATE': config('REQUEST_TIMING_SAMPLE_RATE', default=0.0, cast=float),
+    'SLOW_REQUEST_MS': config('SLOW_REQUEST_MS', default=1000, cast=int),
+    'MAX_LOGGED_QUERIES': 50,
+}
+
+# Prometheus metrics (GET /metrics) are served to staff users and to clients
+# on these networks only, e.g. the scrape network.
+METRICS_ALLOWED_NETWORKS = config('METRICS_ALLOWED_NETWORKS', default='127.0.0.1/32,::1/128', cast=Csv())
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        # Timing lines are already JSON
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'timing': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'movies.timing': {
+            'handlers': ['timing'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # JWT Configuration
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
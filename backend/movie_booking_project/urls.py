@@ -7,6 +7,8 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from movies.metrics import metrics_view
+
 schema_view = get_schema_view(
     openapi.Info(
         title="Movie Booking API",
@@ -23,6 +25,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('movies.urls')),
+    path('metrics', metrics_view, name='metrics'),
     
     # Swagger Documentation URLs
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class MoviesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'movies'
-    verbose_name = 'Movie Booking System'
\ No newline at end of file
+    verbose_name = 'Movie Booking System'
+
+    def ready(self):
+        # Connect the cache invalidation, seat event and metrics receivers
+        from . import cache, events, metrics  # noqa: F401
@@ -0,0 +1,110 @@
+"""
+Native async versions of the catalogue read endpoints.
+
+Under ASGI, the DRF views in ``views.py`` run in a worker thread through
+``sync_to_async``. These views query with Django's async ORM instead and
+serialize in the event loop, so a single worker can serve many concurrent
+catalogue reads without a thread per request.
+
+Serialization stays on the DRF serializers. The querysets preload everything
+the serializers read (the joined movie, show-count annotations and the seat
+bitmap), so ``serializer.data`` never touches the database; any lazy query
+would raise ``SynchronousOnlyOperation`` rather than block the loop.
+The response body matches the sync endpoints' page-number format.
+"""
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Movie, Show
+from .pagination import MAX_PAGE_SIZE, PAGE_SIZE_QUERY_PARAM
+from .serializers import MovieSerializer, ShowSerializer
+
+
+def get_page_size(request):
+    """The requested ``page_size``, or the default when missing or invalid."""
+    try:
+        page_size = int(request.GET[PAGE_SIZE_QUERY_PARAM])
+    except (KeyError, ValueError):
+        page_size = 0
+    if page_size <= 0:
+        return settings.REST_FRAMEWORK['PAGE_SIZE']
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def _page_link(request, page_number, last_page):
+    if page_number < 1 or page_number > last_page:
+        return None
+    url = request.build_absolute_uri()
+    if page_number == 1:
+        return remove_query_param(url, 'page')
+    return replace_query_param(url, 'page', page_number)
+
+
+async def paginate(request, queryset, serializer_class):
+    """
+    Serialize one page of ``queryset`` in DRF's page-number format.
+
+    Returns ``None`` when the requested page does not exist.
+    """
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+    page_size = get_page_size(request)
+
+    count = await queryset.acount()
+    last_page = max(1, -(-count // page_size))
+    if page_number < 1 or page_number > last_page:
+        return None
+
+    offset = (page_number - 1) * page_size
+    items = [item async for item in queryset[offset:offset + page_size].aiterator()]
+    serializer = serializer_class(items, many=True, context={'request': request})
+    return {
+        'count': count,
+        'next': _page_link(request, page_number + 1, last_page),
+        'previous': _page_link(request, page_number - 1, last_page),
+        'results': serializer.data,
+    }
+
+
+async def _list_response(request, queryset, serializer_class):
+    data = await paginate(request, queryset, serializer_class)
+    if data is None:
+        return JsonResponse({'detail': 'Invalid page.'}, status=404)
+    return JsonResponse(data)
+
+
+@require_GET
+async def movie_list(request):
+    """List all movies with their show counts."""
+    queryset = Movie.objects.with_show_counts().order_by('-created_at')
+    return await _list_response(request, queryset, MovieSerializer)
+
+
+@require_GET
+async def movie_detail(request, pk):
+    """Retrieve a movie with its show counts."""
+    try:
+        movie = await Movie.objects.with_show_counts().aget(pk=pk)
+    except Movie.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    return JsonResponse(MovieSerializer(movie, context={'request': request}).data)
+
+
+@require_GET
+async def movie_shows(request, movie_id):
+    """List all shows for a specific movie."""
+    if not await Movie.objects.filter(id=movie_id).aexists():
+        return JsonResponse({'error': 'Movie not found'}, status=404)
+    queryset = Show.objects.for_listing().filter(movie_id=movie_id).order_by('date_time')
+    return await _list_response(request, queryset, ShowSerializer)
+
+
+@require_GET
+async def show_list(request):
+    """List all shows."""
+    queryset = Show.objects.for_listing().order_by('date_time', 'id')
+    return await _list_response(request, queryset, ShowSerializer)
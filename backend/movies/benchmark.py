@@ -0,0 +1,261 @@
+"""
+Load-test harness for the booking endpoints.
+
+``run_benchmark`` creates a benchmark movie, its shows and one user per
+client. Concurrent clients then book random seats. By default each client
+goes through the Django test client in its own thread. With ``base_url`` it
+sends real HTTP requests to a running server that uses the same database.
+The report contains:
+
+* throughput and p50/p95/p99 latency of the booking requests;
+* response status counts (201 booked, 400 seat taken, 503 busy);
+* booking retries and give-ups (``retry.booking_retry_stats``);
+* time spent waiting for the show (``booking.lock_wait_stats``);
+* an invariant check that no seat was booked twice and that every show's
+  seat bitmap matches its booked rows.
+
+Retry and lock-wait numbers are collected in-process and are therefore only
+reported for test-client runs. Use ``manage.py bench_booking`` to run it from
+the command line.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection, connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import seatmap
+from .booking import get_strategy, lock_wait_stats
+from .models import Booking, Movie, Show
+from .retry import booking_retry_stats
+
+BENCHMARK_PREFIX = 'benchmark'
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def create_fixtures(clients, shows, seats):
+    """Create the benchmark movie, its shows and one user per client."""
+    run_id = f'{BENCHMARK_PREFIX}-{time.time_ns()}'
+    movie = Movie.objects.create(title=run_id, duration_minutes=120)
+    start = timezone.now() + timedelta(days=1)
+    show_list = Show.objects.bulk_create(
+        Show(
+            movie=movie,
+            screen_name=f'Screen {number}',
+            date_time=start + timedelta(hours=number),
+            total_seats=seats,
+            price=250,
+        )
+        for number in range(shows)
+    )
+    users = [
+        User.objects.create_user(username=f'{run_id}-{number}')
+        for number in range(clients)
+    ]
+    return movie, show_list, users
+
+
+def delete_fixtures(movie, users):
+    movie.delete()
+    User.objects.filter(id__in=[user.id for user in users]).delete()
+
+
+def check_invariants(shows):
+    """Look for double-booked seats and seat bitmaps out of sync with bookings."""
+    show_ids = [show.id for show in shows]
+    double_booked = list(
+        Booking.objects.filter(show_id__in=show_ids, status='booked')
+        .values('show_id', 'seat_number')
+        .annotate(bookings=Count('id'))
+        .filter(bookings__gt=1)
+        .order_by('show_id', 'seat_number')
+    )
+    booked = {}
+    for show_id, seat_number in Booking.objects.filter(
+        show_id__in=show_ids, status='booked'
+    ).values_list('show_id', 'seat_number'):
+        booked.setdefault(show_id, set()).add(seat_number)
+    seat_map_mismatches = [
+        show_id
+        for show_id, seat_map in Show.objects.filter(id__in=show_ids).values_list('id', 'seat_map')
+        if set(seatmap.booked_seats(seat_map)) != booked.get(show_id, set())
+    ]
+    return {
+        'booked_seats': sum(len(seats) for seats in booked.values()),
+        'double_booked': double_booked,
+        'seat_map_mismatches': seat_map_mismatches,
+        'ok': not double_booked and not seat_map_mismatches,
+    }
+
+
+class TestClientTransport:
+    """Send booking requests through the Django test client."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def post(self, path, payload, token):
+        response = self.client.post(
+            path, json.dumps(payload), content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        return response.status_code
+
+    def close(self):
+        # Each client thread opens its own database connection
+        connections.close_all()
+
+
+class HTTPTransport:
+    """Send booking requests to a running server."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def post(self, path, payload, token):
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode(),
+            headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {token}'},
+            method='POST',
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+    def close(self):
+        pass
+
+
+def run_benchmark(clients=10, requests_per_client=20, shows=1, seats=100,
+                  seats_per_request=1, base_url=None, seed=None, keep=False):
+    """
+    Fire ``clients`` concurrent clients at ``shows`` shows and report the results.
+
+    Each client sends ``requests_per_client`` booking requests for
+    ``seats_per_request`` random seats on a random show; more clients per
+    show means more contention. Returns the report as a dict.
+    """
+    rng = random.Random(seed)
+    movie, show_list, users = create_fixtures(clients, shows, seats)
+    tokens = [str(RefreshToken.for_user(user).access_token) for user in users]
+    # Pick every request up front so a seeded run is reproducible
+    plans = [
+        [
+            (rng.choice(show_list).id, sorted(rng.sample(range(1, seats + 1), seats_per_request)))
+            for _ in range(requests_per_client)
+        ]
+        for _ in range(clients)
+    ]
+
+    latencies = []
+    statuses = Counter()
+    results_lock = threading.Lock()
+    start_barrier = threading.Barrier(clients)
+
+    def client(number):
+        transport = HTTPTransport(base_url) if base_url else TestClientTransport()
+        client_latencies, client_statuses = [], Counter()
+        try:
+            start_barrier.wait()
+            for show_id, seat_numbers in plans[number]:
+                if seats_per_request == 1:
+                    path = reverse('book-seat', kwargs={'show_id': show_id})
+                    payload = {'seat_number': seat_numbers[0]}
+                else:
+                    path = reverse('book-seats-batch', kwargs={'show_id': show_id})
+                    payload = {'seat_numbers': seat_numbers}
+                started = time.perf_counter()
+                status_code = transport.post(path, payload, tokens[number])
+                client_latencies.append(time.perf_counter() - started)
+                client_statuses[status_code] += 1
+        finally:
+            transport.close()
+            with results_lock:
+                latencies.extend(client_latencies)
+                statuses.update(client_statuses)
+
+    booking_retry_stats.reset()
+    lock_wait_stats.reset()
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    # Seat conflicts and give-ups are expected and counted in the report;
+    # don't log a warning for each one
+    loggers = [logging.getLogger(name) for name in ('django.request', 'movies.retry')]
+    log_levels = [logger.level for logger in loggers]
+    for logger in loggers:
+        logger.setLevel(logging.ERROR)
+    started = time.perf_counter()
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for logger, level in zip(loggers, log_levels):
+            logger.setLevel(level)
+    duration = time.perf_counter() - started
+
+    try:
+        invariants = check_invariants(show_list)
+    finally:
+        if not keep:
+            delete_fixtures(movie, users)
+
+    latencies.sort()
+    report = {
+        'config': {
+            'clients': clients,
+            'requests_per_client': requests_per_client,
+            'shows': shows,
+            'seats': seats,
+            'seats_per_request': seats_per_request,
+            'transport': base_url or 'test-client',
+            'database': connection.vendor,
+            'booking_strategy': get_strategy(),
+            'seed': seed,
+        },
+        'duration_seconds': duration,
+        'requests': len(latencies),
+        'throughput_rps': len(latencies) / duration if duration else None,
+        'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        'latency_ms': {
+            name: value * 1000 if value is not None else None
+            for name, value in (
+                ('p50', percentile(latencies, 50)),
+                ('p95', percentile(latencies, 95)),
+                ('p99', percentile(latencies, 99)),
+                ('max', latencies[-1] if latencies else None),
+            )
+        },
+        'invariants': invariants,
+    }
+    if not base_url:
+        lock_wait = lock_wait_stats.snapshot()
+        report['retries'] = booking_retry_stats.snapshot()
+        report['lock_wait_ms'] = {
+            'total': lock_wait['total_seconds'] * 1000,
+            'mean': lock_wait['total_seconds'] * 1000 / lock_wait['count'] if lock_wait['count'] else None,
+            'max': lock_wait['max_seconds'] * 1000,
+        }
+    return report
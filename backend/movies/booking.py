@@ -0,0 +1,188 @@
+"""
+Seat booking pipeline shared by the single-seat and batch booking endpoints.
+
+A booking request loads its show exactly once with ``load_show``;
+validation, the insert, the seat bitmap update and the response payload all
+reuse that instance, so the booking costs one SELECT, one INSERT and one
+UPDATE regardless of how many seats are booked.
+
+How concurrent bookings for the same show are serialized is controlled by
+``settings.BOOKING_STRATEGY``:
+
+``'locking'`` (default)
+    The show row is locked with ``select_for_update`` before validation, so
+    bookings for a show queue behind each other for the whole transaction.
+
+``'optimistic'``
+    The show is read without a lock and the insert relies on the database's
+    partial unique index on ``(show, seat_number)`` for booked rows; a
+    violation is reported as "seat taken" without retrying. Only the final
+    seat bitmap update takes the show row lock, so bookings for different
+    seats overlap for everything but that single UPDATE.
+
+On PostgreSQL every statement in the booking transaction, including the wait
+for the show row lock, is bounded by ``settings.BOOKING_STATEMENT_TIMEOUT_MS``.
+Time spent waiting for the show is recorded in ``lock_wait_stats`` and in
+the request's timings.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+
+from . import metrics, seatmap, timing
+from .models import Show, Booking
+
+LOCKING = 'locking'
+OPTIMISTIC = 'optimistic'
+STRATEGIES = (LOCKING, OPTIMISTIC)
+
+
+class SeatsUnavailable(Exception):
+    """Raised when one or more requested seats are already booked."""
+
+    def __init__(self, seat_numbers):
+        self.seat_numbers = sorted(seat_numbers)
+        super().__init__(f"Seats already booked: {self.seat_numbers}")
+
+
+class LockWaitStats:
+    """Thread-safe totals of the time booking transactions waited for their show."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def record(self, seconds):
+        with self._lock:
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    def snapshot(self):
+        """Return the number of waits and their total and longest duration."""
+        with self._lock:
+            return {
+                'count': self._count,
+                'total_seconds': self._total,
+                'max_seconds': self._max,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._count, self._total, self._max = 0, 0.0, 0.0
+
+
+lock_wait_stats = LockWaitStats()
+
+
+def get_strategy():
+    """Return the configured booking strategy."""
+    strategy = getattr(settings, 'BOOKING_STRATEGY', LOCKING)
+    if strategy not in STRATEGIES:
+        raise ImproperlyConfigured(
+            f"BOOKING_STRATEGY must be one of {STRATEGIES}, got {strategy!r}."
+        )
+    return strategy
+
+
+def set_statement_timeout():
+    """
+    Bound the statements of the current booking transaction.
+
+    Must be called inside ``transaction.atomic()``; ``SET LOCAL`` lasts until
+    the transaction ends. A no-op on databases other than PostgreSQL.
+    """
+    timeout = getattr(settings, 'BOOKING_STATEMENT_TIMEOUT_MS', 0)
+    if timeout and connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL statement_timeout = %s', [int(timeout)])
+
+
+def lock_show(show_id):
+    """
+    Load a show with its movie and lock the show row.
+
+    Must be called inside ``transaction.atomic()``. Only the show row is
+    locked; the joined movie row stays free for other transactions.
+    """
+    return (
+        Show.objects.select_for_update(of=('self',))
+        .select_related('movie')
+        .get(id=show_id)
+    )
+
+
+def load_show(show_id):
+    """Load a show with its movie for booking, locking it if the strategy requires."""
+    set_statement_timeout()
+    if get_strategy() == OPTIMISTIC:
+        return Show.objects.select_related('movie').get(id=show_id)
+    return lock_show(show_id)
+
+
+@contextmanager
+def booking_transaction(show_id):
+    """
+    Open a booking transaction and yield its show, loaded with ``load_show``.
+
+    Bookings wait for each other while the transaction starts (SQLite's
+    ``BEGIN IMMEDIATE``) or while the show is locked (``SELECT ... FOR
+    UPDATE``); the time until the show is loaded is recorded as lock wait.
+    """
+    started = time.perf_counter()
+    with transaction.atomic():
+        show = load_show(show_id)
+        waited = time.perf_counter() - started
+        lock_wait_stats.record(waited)
+        metrics.LOCK_WAIT.observe(waited)
+        timing.record('lock', waited)
+        yield show
+
+
+def unavailable_seats(show, seat_numbers):
+    """Seats from ``seat_numbers`` that are already booked on ``show``."""
+    taken = [seat for seat in seat_numbers if seatmap.is_booked(show.seat_map, seat)]
+    if taken:
+        metrics.SEAT_CONFLICTS.labels('seat_map').inc()
+    return taken
+
+
+def create_bookings(user, show, seat_numbers):
+    """
+    Book ``seat_numbers`` for ``user`` on a show returned by ``load_show``.
+
+    Seats are checked against the show's bitmap, inserted with one bulk
+    insert and marked in the bitmap with one update. A unique constraint
+    violation on insert means another request won the seat; it is raised
+    as ``SeatsUnavailable`` rather than retried.
+    """
+    taken = unavailable_seats(show, seat_numbers)
+    if taken:
+        raise SeatsUnavailable(taken)
+
+    try:
+        with transaction.atomic():
+            bookings = Booking.objects.bulk_create([
+                Booking(
+                    user=user,
+                    show=show,
+                    seat_number=seat_number,
+                    status='booked'
+                )
+                for seat_number in seat_numbers
+            ])
+    except IntegrityError:
+        metrics.SEAT_CONFLICTS.labels('constraint').inc()
+        taken = Booking.objects.filter(
+            show=show,
+            seat_number__in=seat_numbers,
+            status='booked'
+        ).values_list('seat_number', flat=True)
+        raise SeatsUnavailable(list(taken) or seat_numbers)
+
+    show.mark_seats(seat_numbers, lock=get_strategy() == OPTIMISTIC)
+    return bookings
@@ -0,0 +1,254 @@
+"""
+Response cache for the read-mostly catalogue endpoints.
+
+Listings are cached as a "shell": the full serialized response with every
+show's availability fields blanked out. Availability is overlaid per request
+from small per-show seat entries, so a booking only evicts the entry of the
+show it touched and never the cached listings.
+
+Cache keys are versioned instead of deleted:
+
+* ``catalogue`` -- bumped by any Movie or Show change; keys the movie and
+  show lists. Lists are only cached when ``CATALOGUE_CACHE_LISTS`` is on,
+  which by default means the cache is shared across processes: a version
+  bumped in a process-local cache leaves the other workers' lists current.
+* ``movie:<id>`` -- bumped by changes to the movie or one of its shows; keys
+  that movie's show list.
+* ``show-seats:<id>`` -- the show's ``(total_seats, seat_map)``, deleted when
+  its seats change. Only cached when ``CATALOGUE_CACHE_SEATS`` is on, which
+  by default means the cache is shared across processes: deleting an entry
+  in a process-local cache leaves the other workers' copies in place.
+
+Invalidation runs from ``post_save``/``post_delete`` on Movie, Show and
+Booking and from ``seats_changed``, once immediately and once after the
+transaction commits. Settings: ``CATALOGUE_CACHE_TIMEOUT`` (seconds).
+
+Views that read from a replica (``routers.ReplicaReadMixin``) also fill the
+cache from it. Invalidation happens when the primary commits, so a lagging
+replica may cache pre-invalidation rows afterwards: list shells built from a
+replica are kept for ``REPLICA_CACHE_TIMEOUT`` seconds only, and seat
+entries are only ever stored from the primary.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.response import Response
+
+from . import metrics, pagination, seatmap
+from .models import Booking, Movie, Show
+from .routers import reading_from_replica
+from .timing import TimedListMixin
+from .serializers import get_seat_format
+from .signals import seats_changed
+
+SEAT_FIELDS = ('available_seats', 'booked_seat_numbers', 'seat_map')
+
+
+def get_timeout():
+    """Seconds to keep an entry, shortened for data read from a replica."""
+    if reading_from_replica():
+        return getattr(settings, 'REPLICA_CACHE_TIMEOUT', 10)
+    return getattr(settings, 'CATALOGUE_CACHE_TIMEOUT', 300)
+
+
+def get_version(name):
+    """Current version of a cache namespace, created on first use."""
+    # Seed with a timestamp so a namespace evicted from the cache never comes
+    # back with a version that older entries were stored under.
+    return cache.get_or_set(f'version:{name}', time.time_ns, timeout=None)
+
+
+def bump_version(name):
+    """Invalidate every key stored under a namespace's current version."""
+    try:
+        cache.incr(f'version:{name}')
+    except ValueError:
+        cache.set(f'version:{name}', time.time_ns(), timeout=None)
+
+
+def seats_key(show_id):
+    return f'show-seats:{show_id}'
+
+
+def get_show_seats(show_ids):
+    """
+    Map show ids to ``(total_seats, seat_map)``, from the cache where possible.
+
+    Entries missing from the cache are loaded with a single query, from the
+    request's read database. With ``CATALOGUE_CACHE_SEATS`` off every entry
+    is loaded, and none is stored; entries read from a replica are not
+    stored either.
+    """
+    if not getattr(settings, 'CATALOGUE_CACHE_SEATS', True):
+        return load_show_seats(show_ids)
+
+    keys = {seats_key(show_id): show_id for show_id in show_ids}
+    found = cache.get_many(keys)
+    seats = {keys[key]: value for key, value in found.items()}
+
+    missing = [show_id for show_id in show_ids if show_id not in seats]
+    metrics.record_cache_lookups('seats', len(seats), len(missing))
+    if missing:
+        loaded = load_show_seats(missing)
+        if not reading_from_replica():
+            cache.set_many(
+                {seats_key(show_id): value for show_id, value in loaded.items()},
+                get_timeout()
+            )
+        seats.update(loaded)
+    return seats
+
+
+def load_show_seats(show_ids):
+    return {
+        show_id: (total_seats, bytes(seat_map or b''))
+        for show_id, total_seats, seat_map in Show.objects.filter(
+            id__in=show_ids
+        ).values_list('id', 'total_seats', 'seat_map')
+    }
+
+
+def strip_seats(shows):
+    """Blank the availability fields of serialized shows, keeping key order."""
+    return [
+        {key: (None if key in SEAT_FIELDS else value) for key, value in show.items()}
+        for show in shows
+    ]
+
+
+def overlay_seats(shows, seat_format):
+    """Fill the availability fields of cached shows from the seat entries."""
+    seats = get_show_seats([show['id'] for show in shows])
+    for show in shows:
+        if show['id'] in seats:
+            total_seats, seat_map = seats[show['id']]
+            show.update(seatmap.seat_fields(seat_map, total_seats, seat_format))
+    return shows
+
+
+def get_availability(show_ids):
+    """Map show ids to their ``available``/``total``/``sold_out`` counts from the seat entries."""
+    availability = {}
+    for show_id, (total_seats, seat_map) in get_show_seats(show_ids).items():
+        available = total_seats - seatmap.count_booked(seat_map)
+        availability[show_id] = {
+            'available': available,
+            'total': total_seats,
+            'sold_out': available <= 0,
+        }
+    return availability
+
+
+class CachedListMixin(TimedListMixin):
+    """
+    Serve a list view from the catalogue cache.
+
+    ``get_cache_namespaces`` names the versions the cached response depends
+    on; ``cache_show_seats`` marks responses whose items are shows, whose
+    availability is overlaid instead of cached. Only the query parameters in
+    ``cache_query_params`` and those read by the pagination are part of the
+    key, so unknown parameters share the cached response.
+    """
+    cache_show_seats = False
+    cache_query_params = ()
+
+    def get_cache_namespaces(self):
+        return ['catalogue']
+
+    def get_cache_query_params(self):
+        if self.pagination_class is None:
+            return self.cache_query_params
+        return self.cache_query_params + pagination.QUERY_PARAMS
+
+    def get_list_cache_key(self, request):
+        versions = ':'.join(
+            f'{name}={get_version(name)}' for name in self.get_cache_namespaces()
+        )
+        query = urlencode(sorted(
+            (name, value)
+            for name in self.get_cache_query_params()
+            for value in request.query_params.getlist(name)
+        ))
+        # Scheme and host are kept: pagination links in the response use them
+        url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+        return f'list:{self.__class__.__name__}:{versions}:{hashlib.md5(url.encode()).hexdigest()}'
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if not getattr(settings, 'CATALOGUE_CACHE_LISTS', True):
+            return self.get_uncached_response(request, *args, **kwargs)
+        key = self.get_list_cache_key(request)
+        data = cache.get(key)
+        metrics.record_cache_lookups('list', int(data is not None), int(data is None))
+        if data is None:
+            response = self.get_uncached_response(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, self.to_shell(response.data), get_timeout())
+            return response
+        if self.cache_show_seats:
+            overlay_seats(self.get_items(data), get_seat_format(request))
+        return Response(data)
+
+    def get_items(self, data):
+        """The list of items in a (possibly paginated) response body."""
+        return data['results'] if isinstance(data, dict) else data
+
+    def to_shell(self, data):
+        if not self.cache_show_seats:
+            return data
+        if isinstance(data, dict):
+            return {**data, 'results': strip_seats(data['results'])}
+        return strip_seats(data)
+
+
+def invalidate(func):
+    """
+    Run an invalidation now and again once the transaction commits.
+
+    The first run makes the writing transaction's own reads miss; the second
+    discards anything a concurrent reader cached from pre-commit data in
+    between.
+    """
+    func()
+    transaction.on_commit(func)
+
+
+@receiver([post_save, post_delete], sender=Movie)
+def invalidate_movie(sender, instance, **kwargs):
+    movie_id = instance.pk
+
+    def bump():
+        bump_version('catalogue')
+        bump_version(f'movie:{movie_id}')
+    invalidate(bump)
+
+
+@receiver([post_save, post_delete], sender=Show)
+def invalidate_show(sender, instance, **kwargs):
+    show_id, movie_id = instance.pk, instance.movie_id
+
+    def bump():
+        bump_version('catalogue')
+        bump_version(f'movie:{movie_id}')
+        cache.delete(seats_key(show_id))
+    invalidate(bump)
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking(sender, instance, **kwargs):
+    key = seats_key(instance.show_id)
+    invalidate(lambda: cache.delete(key))
+
+
+@receiver(seats_changed)
+def invalidate_seats(sender, show, **kwargs):
+    key = seats_key(show.pk)
+    invalidate(lambda: cache.delete(key))
@@ -0,0 +1,295 @@
+"""
+Synthetic catalogue and booking data at production scale.
+
+``generate`` creates users, movies, shows and bookings with skew similar to
+real traffic:
+
+* movie popularity follows a Zipf-like curve with the newest releases on top,
+  so a few hot releases get most shows and most bookings;
+* shows fall on weekends and evening slots more often, and sell more seats
+  there;
+* a share of bookings is cancelled, leaving the seat free.
+
+Rows are written in chunks, one transaction per task of ``shows_per_task``
+shows: ``bulk_create`` for users, movies and shows, and batched
+``executemany`` for bookings. Each show's seat bitmap is computed before
+insert.
+
+Tasks are seeded from the run seed and their task number alone, so the same
+seed produces the same data whether it runs in one process or in several
+``workers``.
+"""
+import math
+import multiprocessing
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import cache, seatmap
+from .models import Booking, Movie, Show
+
+GENRES = ['Action', 'Drama', 'Comedy', 'Thriller', 'Sci-Fi', 'Animation', 'Horror', 'Romance']
+TITLE_WORDS = [
+    'Midnight', 'Crimson', 'Silent', 'Last', 'Broken', 'Golden', 'Hidden', 'Electric',
+    'Empire', 'River', 'Shadow', 'Horizon', 'Echo', 'Storm', 'Garden', 'Signal',
+]
+# (screen name, seats, price)
+SCREENS = [
+    ('IMAX Screen 1', 300, Decimal('450.00')),
+    ('Dolby Atmos 2', 200, Decimal('380.00')),
+    ('Premium Screen 3', 120, Decimal('320.00')),
+    ('Standard Screen 4', 150, Decimal('250.00')),
+    ('Standard Screen 5', 150, Decimal('250.00')),
+    ('Standard Screen 6', 100, Decimal('220.00')),
+]
+# (hour, minute, demand)
+SLOTS = [(10, 0, 0.4), (13, 0, 0.6), (16, 0, 0.8), (19, 0, 1.5), (21, 30, 1.3)]
+# Monday .. Sunday
+WEEKDAY_DEMAND = [0.7, 0.7, 0.8, 0.9, 1.3, 1.6, 1.4]
+ZIPF_EXPONENT = 1.1
+
+
+def movie_weights(count):
+    """Zipf weights by popularity rank; index 0 is the hottest movie."""
+    return [1 / (rank ** ZIPF_EXPONENT) for rank in range(1, count + 1)]
+
+
+def create_users(count, prefix, batch_size):
+    """
+    Create ``count`` users who cannot log in, reusing existing ones, and
+    return their ids in id order.
+
+    Users left by an earlier run with a larger ``count`` are not returned,
+    so the same seed always draws bookings from the same users.
+    """
+    password = make_password(None)
+    usernames = [f'{prefix}-user-{number}' for number in range(count)]
+    User.objects.bulk_create(
+        (User(username=username, password=password) for username in usernames),
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    # Filtered in Python: an IN list of every username could exceed the
+    # database's query parameter limit
+    users = (
+        User.objects.filter(username__startswith=f'{prefix}-user-')
+        .order_by('id')
+        .values_list('id', 'username')
+    )
+    wanted = set(usernames)
+    return [user_id for user_id, username in users if username in wanted]
+
+
+def create_movies(count, rng, batch_size):
+    """
+    Create ``count`` movies and return their ids, hottest first.
+
+    Popularity rank follows release date: the newest release is the hottest.
+    """
+    today = date.today()
+    release_offsets = sorted(rng.randrange(0, 730) for _ in range(count))
+    movies = [
+        Movie(
+            title=f'{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {number + 1}',
+            duration_minutes=rng.randint(85, 180),
+            genre=rng.choice(GENRES),
+            rating=Decimal(rng.randint(30, 95)) / 10,
+            description='Generated for load testing.',
+            release_date=today - timedelta(days=offset),
+        )
+        for number, offset in enumerate(release_offsets)
+    ]
+    return [movie.id for movie in Movie.objects.bulk_create(movies, batch_size=batch_size)]
+
+
+class ShowGenerator:
+    """
+    Generate one task's shows and bookings.
+
+    Demand multipliers are normalized so an average show sells
+    ``bookings_per_show`` seats before capping at its capacity.
+    """
+
+    def __init__(self, movie_ids, user_ids, bookings_per_show, days, cancel_rate,
+                 start, seed, batch_size):
+        self.movie_ids = movie_ids
+        self.user_ids = user_ids
+        self.bookings_per_show = bookings_per_show
+        self.days = days
+        self.cancel_rate = cancel_rate
+        self.start = start
+        self.seed = seed
+        self.batch_size = batch_size
+
+        weights = movie_weights(len(movie_ids))
+        self.movie_cum_weights = list(_accumulate(weights))
+        # Shows are spread in proportion to weight, so the average movie
+        # multiplier over shows is sum(w^2) / sum(w)
+        mean_weight = sum(w * w for w in weights) / sum(weights)
+        self.movie_demand = [w / mean_weight for w in weights]
+
+        day_demand = [WEEKDAY_DEMAND[(start + timedelta(days=day)).weekday()] for day in range(days)]
+        self.day_cum_weights = list(_accumulate(day_demand))
+        slot_demand = [demand for _, _, demand in SLOTS]
+        self.slot_cum_weights = list(_accumulate(slot_demand))
+        # Days and slots are also picked in proportion to demand
+        self.time_demand_mean = (
+            sum(d * d for d in day_demand) / sum(day_demand)
+            * sum(d * d for d in slot_demand) / sum(slot_demand)
+        )
+
+    def build(self, task, show_count):
+        """Return unsaved shows and, per show, its ``(seat, user_id, status)`` bookings."""
+        rng = random.Random(f'{self.seed}-{task}')
+        shows, show_bookings = [], []
+        for _ in range(show_count):
+            movie_index = rng.choices(range(len(self.movie_ids)), cum_weights=self.movie_cum_weights)[0]
+            day = rng.choices(range(self.days), cum_weights=self.day_cum_weights)[0]
+            slot = rng.choices(range(len(SLOTS)), cum_weights=self.slot_cum_weights)[0]
+            screen_name, total_seats, price = rng.choice(SCREENS)
+            hour, minute, slot_demand = SLOTS[slot]
+            show_date = self.start + timedelta(days=day)
+            date_time = timezone.make_aware(datetime.combine(show_date, time(hour, minute)))
+
+            demand = (
+                self.movie_demand[movie_index]
+                * WEEKDAY_DEMAND[show_date.weekday()] * slot_demand / self.time_demand_mean
+            )
+            sold = min(total_seats, round(self.bookings_per_show * demand * rng.uniform(0.5, 1.5)))
+            seats = rng.sample(range(1, total_seats + 1), sold)
+            bookings = [
+                (
+                    seat,
+                    rng.choice(self.user_ids),
+                    'cancelled' if rng.random() < self.cancel_rate else 'booked',
+                )
+                for seat in seats
+            ]
+            shows.append(Show(
+                movie_id=self.movie_ids[movie_index],
+                screen_name=screen_name,
+                date_time=date_time,
+                total_seats=total_seats,
+                price=price,
+                seat_map=seatmap.from_seats(
+                    seat for seat, _, status in bookings if status == 'booked'
+                ),
+            ))
+            show_bookings.append(bookings)
+        return shows, show_bookings
+
+    def write(self, task, show_count):
+        """Generate and insert one task in a single transaction; return the row counts."""
+        shows, show_bookings = self.build(task, show_count)
+        with transaction.atomic():
+            shows = Show.objects.bulk_create(shows, batch_size=self.batch_size)
+            booking_count = insert_bookings(
+                [
+                    (user_id, show.id, seat, status)
+                    for show, rows in zip(shows, show_bookings)
+                    for seat, user_id, status in rows
+                ],
+                self.batch_size,
+            )
+        return len(shows), booking_count
+
+
+def insert_bookings(rows, batch_size):
+    """
+    Insert ``(user_id, show_id, seat_number, status)`` rows in batches.
+
+    Bookings outnumber everything else by orders of magnitude, and preparing
+    model instances field by field dominates ``bulk_create`` at that volume,
+    so the rows go through ``executemany`` with the timestamps adapted once.
+    """
+    connection = connections[Booking.objects.db]
+    opts = Booking._meta
+    columns = ['user', 'show', 'seat_number', 'status', 'created_at', 'updated_at']
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        connection.ops.quote_name(opts.db_table),
+        ', '.join(connection.ops.quote_name(opts.get_field(name).column) for name in columns),
+        ', '.join(['%s'] * len(columns)),
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(sql, [row + (now, now) for row in rows[offset:offset + batch_size]])
+    return len(rows)
+
+
+def _accumulate(values):
+    total = 0
+    for value in values:
+        total += value
+        yield total
+
+
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    import django
+    django.setup()
+    # Never share the parent's database connections
+    connections.close_all()
+    _worker_generator = generator
+
+
+def _write_task(args):
+    return _worker_generator.write(*args)
+
+
+def generate(movies, shows, bookings, users, days=30, cancel_rate=0.1, seed=0,
+             workers=1, shows_per_task=1000, batch_size=5000, prefix='gen', progress=None):
+    """
+    Generate the dataset and return the number of rows created per model.
+
+    ``bookings`` is a target: shows never sell more than their capacity, so
+    the actual count can be lower when the target exceeds what fits.
+    ``progress`` is called with the running totals after each task.
+    """
+    rng = random.Random(seed)
+    user_ids = create_users(users, f'{prefix}{seed}', batch_size)
+    movie_ids = create_movies(movies, rng, batch_size)
+
+    generator = ShowGenerator(
+        movie_ids, user_ids,
+        bookings_per_show=bookings / shows if shows else 0,
+        days=days,
+        cancel_rate=cancel_rate,
+        start=date.today() + timedelta(days=1),
+        seed=seed,
+        batch_size=batch_size,
+    )
+    tasks = [
+        (task, min(shows_per_task, shows - task * shows_per_task))
+        for task in range(math.ceil(shows / shows_per_task))
+    ]
+
+    totals = {'users': len(user_ids), 'movies': len(movie_ids), 'shows': 0, 'bookings': 0}
+    if workers > 1:
+        connections.close_all()
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(generator,)) as pool:
+            results = pool.imap_unordered(_write_task, tasks)
+            for show_count, booking_count in results:
+                totals['shows'] += show_count
+                totals['bookings'] += booking_count
+                if progress:
+                    progress(totals)
+    else:
+        for task in tasks:
+            show_count, booking_count = generator.write(*task)
+            totals['shows'] += show_count
+            totals['bookings'] += booking_count
+            if progress:
+                progress(totals)
+
+    # The inserts bypass the model signals; drop cached listings explicitly
+    cache.bump_version('catalogue')
+    return totals
@@ -0,0 +1,112 @@
+"""
+Real-time seat availability events.
+
+Committed seat changes (``seats_changed``) are published to a broadcaster,
+which fans them out to the Server-Sent Events streams of
+``show_seat_events``. The default ``InProcessBroadcaster`` delivers within
+one process; set ``SEAT_EVENTS_BACKEND`` to the dotted path of another class
+with the same ``subscribe``/``unsubscribe``/``publish`` interface (e.g. one
+backed by Redis pub/sub) to fan out across processes.
+
+Subscribers are asyncio queues read by streaming responses under ASGI, so an
+idle subscriber costs a queue and a suspended coroutine, not a thread.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .signals import seats_changed
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One subscriber's bounded event queue, bound to its event loop."""
+
+    def __init__(self, show_id, max_pending=100):
+        self.show_id = show_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def deliver(self, event):
+        """Queue an event; runs on the subscriber's loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client missed deltas; tell it to refetch the show
+            self.overflowed = True
+
+
+class InProcessBroadcaster:
+    """
+    Fan out seat events to subscribers in the current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, show_id):
+        """Register a subscriber for a show; call from the event loop."""
+        subscription = Subscription(show_id)
+        with self._lock:
+            self._subscribers[show_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.show_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.show_id]
+
+    def subscriber_count(self, show_id=None):
+        with self._lock:
+            if show_id is not None:
+                return len(self._subscribers.get(show_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, show_id, event):
+        """Send an event to every subscriber of a show; safe from any thread."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(show_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=None)
+def get_broadcaster():
+    """The process-wide broadcaster configured by ``SEAT_EVENTS_BACKEND``."""
+    backend = getattr(settings, 'SEAT_EVENTS_BACKEND', 'movies.events.InProcessBroadcaster')
+    return import_string(backend)()
+
+
+def format_event(event_type, data):
+    """Encode one Server-Sent Events message."""
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+
+@receiver(seats_changed)
+def publish_seat_change(sender, show, seat_numbers, booked, **kwargs):
+    """Publish a booked/cancelled delta once the transaction commits."""
+    event = {
+        'type': 'booked' if booked else 'cancelled',
+        'show_id': show.pk,
+        'seats': sorted(seat_numbers),
+        'available_seats': show.available_seats,
+    }
+    transaction.on_commit(lambda: get_broadcaster().publish(event['show_id'], event))
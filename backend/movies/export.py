@@ -0,0 +1,165 @@
+"""
+Streaming booking exports for reporting.
+
+Bookings are read with ``.values()`` over the joined user, show and movie
+columns and ``.iterator(chunk_size=...)``, so no model instances are built
+and only one chunk of rows is held at a time (PostgreSQL streams it from a
+server-side cursor). Rows are encoded as CSV or NDJSON and written out in
+batches, keeping memory flat however many bookings match.
+"""
+import csv
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Booking
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# (output column, ``values()`` lookup)
+COLUMNS = [
+    ('booking_id', 'id'),
+    ('status', 'status'),
+    ('seat_number', 'seat_number'),
+    ('booked_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+    ('user_id', 'user_id'),
+    ('username', 'user__username'),
+    ('email', 'user__email'),
+    ('show_id', 'show_id'),
+    ('show_time', 'show__date_time'),
+    ('screen', 'show__screen_name'),
+    ('price', 'show__price'),
+    ('movie_id', 'show__movie_id'),
+    ('movie_title', 'show__movie__title'),
+]
+
+# Spreadsheet applications run cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Encoded rows per chunk of output
+LINES_PER_WRITE = 500
+
+
+def get_chunk_size():
+    return getattr(settings, 'BOOKING_EXPORT_CHUNK_SIZE', 2000)
+
+
+def export_queryset(show=None, movie=None, date_from=None, date_to=None, status=None):
+    """
+    Return the bookings to export as ``values()`` rows, oldest first.
+
+    ``date_from`` and ``date_to`` are inclusive booking dates in the current
+    time zone.
+    """
+    queryset = Booking.objects.all()
+    if show is not None:
+        queryset = queryset.filter(show_id=show)
+    if movie is not None:
+        queryset = queryset.filter(show__movie_id=movie)
+    if date_from is not None:
+        queryset = queryset.filter(created_at__gte=_start_of_day(date_from))
+    if date_to is not None:
+        queryset = queryset.filter(created_at__lt=_start_of_day(date_to + timedelta(days=1)))
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    return queryset.order_by('created_at', 'id').values(*(lookup for _, lookup in COLUMNS))
+
+
+def parse_filters(params):
+    """
+    Read export filters from query parameters.
+
+    Raises ``ValueError`` with a message for the client on invalid input.
+    """
+    filters = {}
+    for name in ('show', 'movie'):
+        if params.get(name):
+            try:
+                filters[name] = int(params[name])
+            except ValueError:
+                raise ValueError(f'{name} must be an integer id.')
+    for name in ('date_from', 'date_to'):
+        if params.get(name):
+            try:
+                filters[name] = date.fromisoformat(params[name])
+            except ValueError:
+                raise ValueError(f'{name} must be a date in YYYY-MM-DD format.')
+    if params.get('status'):
+        filters['status'] = parse_status(params['status'])
+    return filters
+
+
+def parse_status(value):
+    statuses = [choice for choice, _ in Booking.STATUS_CHOICES]
+    if value not in statuses:
+        raise ValueError(f"status must be one of: {', '.join(statuses)}.")
+    return value
+
+
+def stream(rows, export_format):
+    """Encode ``values()`` rows, yielding strings of up to ``LINES_PER_WRITE`` lines."""
+    encode, lines = _encoder(export_format)
+    for row in rows:
+        lines.append(encode(row))
+        if len(lines) >= LINES_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+async def astream(rows, export_format):
+    """Async version of ``stream`` for rows from ``aiterator()``."""
+    encode, lines = _encoder(export_format)
+    async for row in rows:
+        lines.append(encode(row))
+        if len(lines) >= LINES_PER_WRITE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+class _Echo:
+    """File-like object whose ``write`` returns the line for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+def _encoder(export_format):
+    """Return the row encoder and the initial output lines for a format."""
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+        lookups = [lookup for _, lookup in COLUMNS]
+
+        def encode(row):
+            return writer.writerow([_csv_value(row[lookup]) for lookup in lookups])
+
+        return encode, [writer.writerow([column for column, _ in COLUMNS])]
+
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+
+    def encode(row):
+        return encoder.encode({column: row[lookup] for column, lookup in COLUMNS}) + '\n'
+
+    return encode, []
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    # User-supplied text such as usernames and titles is kept as plain text
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
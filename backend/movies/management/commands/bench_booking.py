@@ -0,0 +1,73 @@
+"""
+Django management command to load-test seat booking under contention.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.benchmark import run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent booking clients at one or more shows and report latency and correctness'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=10, help='Concurrent clients')
+        parser.add_argument('--requests', type=int, default=20, help='Booking requests per client')
+        parser.add_argument('--shows', type=int, default=1, help='Shows to spread the clients over')
+        parser.add_argument('--seats', type=int, default=100, help='Seats per show')
+        parser.add_argument('--seats-per-request', type=int, default=1,
+                            help='Seats per request; more than one uses the batch endpoint')
+        parser.add_argument('--url', help='Base URL of a running server (default: in-process test client)')
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark movie, shows and users')
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1 or options['requests'] < 1 or options['shows'] < 1:
+            raise CommandError('--clients, --requests and --shows must be at least 1.')
+        if not 1 <= options['seats_per_request'] <= options['seats']:
+            raise CommandError('--seats-per-request must be between 1 and --seats.')
+
+        report = run_benchmark(
+            clients=options['clients'],
+            requests_per_client=options['requests'],
+            shows=options['shows'],
+            seats=options['seats'],
+            seats_per_request=options['seats_per_request'],
+            base_url=options['url'],
+            seed=options['seed'],
+            keep=options['keep'],
+        )
+
+        latency = report['latency_ms']
+        self.stdout.write(
+            f"{report['requests']} requests in {report['duration_seconds']:.2f}s "
+            f"({report['throughput_rps']:.1f} req/s)"
+        )
+        self.stdout.write(
+            f"Latency ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+            f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}"
+        )
+        self.stdout.write(f"Statuses: {report['statuses']}")
+        if 'retries' in report:
+            self.stdout.write(
+                f"Retries: {report['retries']['retries']}  give-ups: {report['retries']['give_ups']}  "
+                f"lock wait ms: total {report['lock_wait_ms']['total']:.1f}  "
+                f"max {report['lock_wait_ms']['max']:.1f}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
+
+        invariants = report['invariants']
+        if not invariants['ok']:
+            raise CommandError(
+                f"Invariant violated: double-booked {invariants['double_booked']}, "
+                f"seat map mismatches {invariants['seat_map_mismatches']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"No double bookings ({invariants['booked_seats']} seats booked)"
+        ))
@@ -0,0 +1,51 @@
+"""
+Django management command to stream bookings to CSV or NDJSON for reporting.
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies import export
+
+
+class Command(BaseCommand):
+    help = 'Export bookings as CSV or NDJSON, filtered by show, movie, booking date or status'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(export.FORMATS), default='csv',
+                            help='Output format')
+        parser.add_argument('--output', help='File to write (default: standard output)')
+        parser.add_argument('--show', type=int, help='Only bookings for this show id')
+        parser.add_argument('--movie', type=int, help='Only bookings for this movie id')
+        parser.add_argument('--date-from', type=date.fromisoformat,
+                            help='First booking date, YYYY-MM-DD (inclusive)')
+        parser.add_argument('--date-to', type=date.fromisoformat,
+                            help='Last booking date, YYYY-MM-DD (inclusive)')
+        parser.add_argument('--status', help='Only bookings with this status')
+        parser.add_argument('--chunk-size', type=int, default=export.get_chunk_size(),
+                            help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if options['status'] is not None:
+            try:
+                export.parse_status(options['status'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+
+        rows = export.export_queryset(
+            show=options['show'],
+            movie=options['movie'],
+            date_from=options['date_from'],
+            date_to=options['date_to'],
+            status=options['status'],
+        ).iterator(chunk_size=options['chunk_size'])
+        content = export.stream(rows, options['format'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+                output.writelines(content)
+        else:
+            for chunk in content:
+                self.stdout.write(chunk, ending='')
@@ -0,0 +1,63 @@
+"""
+Django management command to generate a large synthetic dataset for benchmarking.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.datagen import generate
+
+
+class Command(BaseCommand):
+    help = 'Generate skewed synthetic users, movies, shows and bookings at production scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movies', type=int, default=1000, help='Movies to create')
+        parser.add_argument('--shows', type=int, default=50000, help='Shows to create')
+        parser.add_argument('--bookings', type=int, default=1000000,
+                            help='Target number of booking rows (capped by show capacity)')
+        parser.add_argument('--users', type=int, default=10000, help='Users to create')
+        parser.add_argument('--days', type=int, default=30, help='Days ahead to schedule shows over')
+        parser.add_argument('--cancel-rate', type=float, default=0.1,
+                            help='Share of bookings that are cancelled (0-1)')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; same seed, same data')
+        parser.add_argument('--workers', type=int, default=1, help='Parallel worker processes')
+        parser.add_argument('--shows-per-task', type=int, default=1000,
+                            help='Shows written per transaction')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        if min(options['movies'], options['users'], options['days'], options['workers'],
+               options['shows_per_task'], options['batch_size']) < 1:
+            raise CommandError('--movies, --users, --days, --workers, --shows-per-task and '
+                               '--batch-size must be at least 1.')
+        if options['shows'] < 0 or options['bookings'] < 0:
+            raise CommandError('--shows and --bookings cannot be negative.')
+        if not 0 <= options['cancel_rate'] <= 1:
+            raise CommandError('--cancel-rate must be between 0 and 1.')
+
+        started = time.perf_counter()
+
+        def progress(totals):
+            self.stdout.write(
+                f"{totals['shows']}/{options['shows']} shows, {totals['bookings']} bookings "
+                f"({time.perf_counter() - started:.0f}s)"
+            )
+
+        totals = generate(
+            movies=options['movies'],
+            shows=options['shows'],
+            bookings=options['bookings'],
+            users=options['users'],
+            days=options['days'],
+            cancel_rate=options['cancel_rate'],
+            seed=options['seed'],
+            workers=options['workers'],
+            shows_per_task=options['shows_per_task'],
+            batch_size=options['batch_size'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {totals['users']} users, {totals['movies']} movies, {totals['shows']} shows "
+            f"and {totals['bookings']} bookings in {time.perf_counter() - started:.1f}s"
+        ))
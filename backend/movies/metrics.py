@@ -0,0 +1,212 @@
+"""
+Prometheus metrics, served in the text format at ``/metrics``.
+
+Metrics are kept in-process by ``prometheus_client``; no collector service is
+involved. Under gunicorn, set ``PROMETHEUS_MULTIPROC_DIR`` to an empty,
+writable directory before the workers start: every worker then writes its
+samples to memory-mapped files there and ``/metrics`` aggregates all workers
+(see ``gunicorn.conf.py`` for cleaning up after exited workers).
+
+Counters are incremented where the events happen:
+
+* request latency and DB time per URL name -- ``RequestTimingMiddleware``;
+* seats booked and cancelled -- committed ``seats_changed`` signals;
+* seat conflicts -- ``booking.unavailable_seats`` and the unique constraint;
+* booking attempts, retries and give-ups -- ``retry.booking_retry_stats``;
+* lock wait -- ``booking.booking_transaction``;
+* cache hits and misses -- ``cache.CachedListMixin`` and ``cache.get_show_seats``;
+* database connections opened -- ``connection_created``.
+
+Django's connections belong to the thread that opened them, so each thread
+keeps the open and in-use gauges up to date for its own: a connection is
+counted as open on ``connection_created`` and as closed when the thread
+finds it closed at the start or end of a request, and it is in use while
+its thread serves a request. With ``DB_POOL`` the psycopg pool's
+``get_stats()`` are read on every scrape. Under gunicorn each worker reports
+its own connections and they are summed.
+
+``/metrics`` is served to staff users and to clients in
+``settings.METRICS_ALLOWED_NETWORKS`` only.
+"""
+import ipaddress
+import os
+import threading
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess,
+)
+
+from .signals import seats_changed
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by URL name',
+    ['view', 'method', 'status'],
+)
+REQUEST_DB_TIME = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request, by URL name',
+    ['view'],
+)
+SEATS_BOOKED = Counter('booking_seats_booked_total', 'Seats booked (committed)')
+SEATS_CANCELLED = Counter('booking_seats_cancelled_total', 'Seats released by cancellations (committed)')
+SEAT_CONFLICTS = Counter(
+    'booking_seat_conflicts_total', 'Booking requests rejected because a seat was taken',
+    ['check'],
+)
+BOOKING_RETRY_EVENTS = Counter(
+    'booking_retry_events_total', 'Booking transaction attempts, retries and give-ups',
+    ['event'],
+)
+LOCK_WAIT = Histogram(
+    'booking_lock_wait_seconds', 'Time booking transactions waited for their show',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+CACHE_REQUESTS = Counter(
+    'catalogue_cache_requests_total', 'Catalogue cache lookups by result',
+    ['cache', 'result'],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    'db_connections_opened_total', 'Database connections opened', ['alias'],
+)
+DB_CONNECTIONS_OPEN = Gauge(
+    'db_connections_open', 'Open database connections', ['alias'],
+    multiprocess_mode='livesum',
+)
+DB_CONNECTIONS_IN_USE = Gauge(
+    'db_connections_in_use', 'Open database connections held by a request in progress', ['alias'],
+    multiprocess_mode='livesum',
+)
+DB_POOL_STATS = Gauge(
+    'db_pool_stats', 'psycopg connection pool statistics (pool.get_stats())', ['alias', 'stat'],
+    multiprocess_mode='livesum',
+)
+
+# Aliases of the current thread's connections counted as open and as in use
+_thread_connections = threading.local()
+
+def observe_request(request, response, timings):
+    """Record a finished request's latency and DB time under its URL name."""
+    match = getattr(request, 'resolver_match', None)
+    view = (match.url_name or match.view_name) if match else 'unmatched'
+    REQUEST_LATENCY.labels(view, request.method, response.status_code).observe(timings.total)
+    REQUEST_DB_TIME.labels(view).observe(timings.db_time)
+
+
+def record_cache_lookups(cache_name, hits, misses):
+    if hits:
+        CACHE_REQUESTS.labels(cache_name, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache_name, 'miss').inc(misses)
+
+
+@receiver(seats_changed)
+def count_seat_change(sender, seat_numbers, booked, **kwargs):
+    counter = SEATS_BOOKED if booked else SEATS_CANCELLED
+    count = len(seat_numbers)
+    transaction.on_commit(lambda: counter.inc(count))
+
+
+def _counted_connections():
+    state = _thread_connections
+    if not hasattr(state, 'open'):
+        state.open = set()
+        state.in_use = set()
+        state.serving = False
+    return state
+
+
+def _count_closed_connections(state):
+    """Stop counting this thread's connections that have been closed since."""
+    for alias in list(state.open):
+        if connections[alias].connection is None:
+            state.open.discard(alias)
+            DB_CONNECTIONS_OPEN.labels(alias).dec()
+            if alias in state.in_use:
+                state.in_use.discard(alias)
+                DB_CONNECTIONS_IN_USE.labels(alias).dec()
+
+
+def _count_in_use(state, alias):
+    if alias not in state.in_use:
+        state.in_use.add(alias)
+        DB_CONNECTIONS_IN_USE.labels(alias).inc()
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    DB_CONNECTIONS_OPENED.labels(connection.alias).inc()
+    state = _counted_connections()
+    # A wrapper reconnecting after a close outside a request is still counted
+    if connection.alias not in state.open:
+        state.open.add(connection.alias)
+        DB_CONNECTIONS_OPEN.labels(connection.alias).inc()
+    if state.serving:
+        _count_in_use(state, connection.alias)
+
+
+@receiver(request_started)
+def track_request_start(sender, **kwargs):
+    state = _counted_connections()
+    _count_closed_connections(state)
+    state.serving = True
+    for alias in state.open:
+        _count_in_use(state, alias)
+
+
+@receiver(request_finished)
+def track_request_end(sender, **kwargs):
+    # Runs after Django's close_old_connections, connected when django.db
+    # was imported, so connections it closed are no longer counted as open
+    state = _counted_connections()
+    _count_closed_connections(state)
+    state.serving = False
+    for alias in state.in_use:
+        DB_CONNECTIONS_IN_USE.labels(alias).dec()
+    state.in_use.clear()
+
+
+def update_pool_gauges():
+    """Set the pool gauges from the psycopg pool of every alias that has one."""
+    for alias in connections:
+        # Only the PostgreSQL backend has a pool, and only with OPTIONS['pool'];
+        # it is shared by every thread's connection to the alias
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            for stat, value in pool.get_stats().items():
+                DB_POOL_STATS.labels(alias, stat).set(value)
+
+
+def can_scrape(request):
+    """Whether ``request`` comes from a staff user or an allowed network."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in getattr(settings, 'METRICS_ALLOWED_NETWORKS', ())
+    )
+
+
+@require_GET
+def metrics_view(request):
+    """Expose all metrics in the Prometheus text format."""
+    if not can_scrape(request):
+        return HttpResponseForbidden()
+    update_pool_gauges()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
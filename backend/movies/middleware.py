@@ -0,0 +1,132 @@
+"""
+Request timing middleware.
+
+Every request is timed with ``timing.RequestTimings`` and reported three ways:
+
+* a ``Server-Timing`` response header with the total, database (with the
+  query count), serialization, response rendering and booking lock-wait
+  durations, shown in the browser's network panel;
+* Prometheus latency and DB time histograms (``metrics.observe_request``);
+* a JSON log line on the ``movies.timing`` logger for a random sample of
+  requests, and for every request slower than the slow threshold, which
+  also logs the request's SQL statements with their durations.
+
+Settings (``settings.REQUEST_TIMING``): ``SERVER_TIMING_HEADER``,
+``SAMPLE_RATE`` (0-1), ``SLOW_REQUEST_MS`` and ``MAX_LOGGED_QUERIES``.
+"""
+import json
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import observe_request
+from .timing import RequestTimings, current
+
+logger = logging.getLogger('movies.timing')
+
+DEFAULTS = {
+    'SERVER_TIMING_HEADER': True,
+    'SAMPLE_RATE': 0.0,
+    'SLOW_REQUEST_MS': 1000,
+    'MAX_LOGGED_QUERIES': 50,
+}
+
+# Server-Timing metric names and descriptions of the recorded spans
+SPANS = {
+    'serialize': 'Serialization',
+    'render': 'Response rendering',
+    'lock': 'Booking lock wait',
+}
+
+
+def get_options():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_TIMING', {})}
+
+
+def server_timing(timings):
+    """Format timings as a ``Server-Timing`` header value."""
+    metrics = [
+        f'total;dur={timings.total * 1000:.1f}',
+        f'db;dur={timings.db_time * 1000:.1f};desc="{timings.query_count} queries"',
+    ]
+    for name, description in SPANS.items():
+        if name in timings.spans:
+            metrics.append(f'{name};dur={timings.spans[name] * 1000:.1f};desc="{description}"')
+    return ', '.join(metrics)
+
+
+def log_entry(request, response, timings):
+    match = getattr(request, 'resolver_match', None)
+    return {
+        'method': request.method,
+        'path': request.path,
+        'view': match.view_name if match else None,
+        'status': response.status_code,
+        'total_ms': round(timings.total * 1000, 3),
+        'db_ms': round(timings.db_time * 1000, 3),
+        'queries': timings.query_count,
+        **{f'{name}_ms': round(seconds * 1000, 3) for name, seconds in timings.spans.items()},
+    }
+
+
+class RequestTimingMiddleware:
+    """
+    Time each request and report it in a header, metrics and a sampled JSON log.
+
+    Runs natively in both sync and async stacks, so async views and
+    streaming responses are not pushed onto a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        options = get_options()
+        timings = RequestTimings(max_queries=options['MAX_LOGGED_QUERIES'])
+        with timings.activate():
+            response = self.get_response(request)
+        self.report(request, response, timings, options)
+        return response
+
+    async def __acall__(self, request):
+        options = get_options()
+        timings = RequestTimings(max_queries=options['MAX_LOGGED_QUERIES'])
+        with timings.activate():
+            response = await self.get_response(request)
+        self.report(request, response, timings, options)
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the rendering of DRF and template responses."""
+        timings = current()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                timings.record('render', time.perf_counter() - started)
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, timings, options):
+        observe_request(request, response, timings)
+        if options['SERVER_TIMING_HEADER']:
+            response['Server-Timing'] = server_timing(timings)
+
+        slow = timings.total * 1000 >= options['SLOW_REQUEST_MS']
+        if slow or random.random() < options['SAMPLE_RATE']:
+            entry = log_entry(request, response, timings)
+            if slow:
+                entry['slow'] = True
+                entry['sql'] = timings.queries
+            logger.log(logging.WARNING if slow else logging.INFO, json.dumps(entry))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:59
+
+from itertools import groupby
+
+from django.db import migrations, models
+
+from movies import seatmap
+
+
+def backfill_seat_maps(apps, schema_editor):
+    """Build the occupancy bitmap of every show from its booked rows."""
+    Show = apps.get_model('movies', 'Show')
+    Booking = apps.get_model('movies', 'Booking')
+
+    booked = (
+        Booking.objects.filter(status='booked')
+        .order_by('show_id')
+        .values_list('show_id', 'seat_number')
+        .iterator(chunk_size=2000)
+    )
+    pending = []
+    for show_id, rows in groupby(booked, key=lambda row: row[0]):
+        pending.append(Show(id=show_id, seat_map=seatmap.from_seats(seat for _, seat in rows)))
+        if len(pending) >= 500:
+            Show.objects.bulk_update(pending, ['seat_map'])
+            pending = []
+    if pending:
+        Show.objects.bulk_update(pending, ['seat_map'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='show',
+            name='seat_map',
+            field=models.BinaryField(default=b'', help_text='Occupancy bitmap; bit n-1 is set when seat n is booked'),
+        ),
+        migrations.RunPython(backfill_seat_maps, migrations.RunPython.noop),
+    ]
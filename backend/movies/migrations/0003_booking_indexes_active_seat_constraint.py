@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+from movies.operations import AddConstraintConcurrently, AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    # Indexes are built concurrently on PostgreSQL, which cannot run inside a
+    # transaction.
+    atomic = False
+
+    dependencies = [
+        ('movies', '0002_show_seat_map'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['show', 'status'], name='booking_show_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='show',
+            index=models.Index(fields=['movie', 'date_time'], name='show_movie_datetime_idx'),
+        ),
+        # Build the partial unique index before dropping the old constraint so
+        # seats are never unprotected.
+        AddConstraintConcurrently(
+            model_name='booking',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'booked')), fields=('show', 'seat_number'), name='unique_booked_seat_per_show'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='booking',
+            unique_together=set(),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:05
+
+from django.db import migrations, models
+
+from movies.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0003_booking_indexes_active_seat_constraint'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='show',
+            index=models.Index(fields=['date_time', 'id'], name='show_datetime_id_idx'),
+        ),
+    ]
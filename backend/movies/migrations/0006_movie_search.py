@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:40
+
+from django.db import migrations, models
+
+from movies.operations import AddIndexConcurrently
+
+# The full-text index as of this migration, kept here rather than imported
+# from movies.search so later changes there cannot alter it.
+FTS_TABLE = 'movies_movie_fts'
+GIN_INDEX = 'movie_search_idx'
+
+SQLITE_INDEX_SQL = [
+    """
+    CREATE VIRTUAL TABLE movies_movie_fts USING fts5(
+        title, description, genre,
+        content='movies_movie', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER movies_movie_fts_insert AFTER INSERT ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(rowid, title, description, genre)
+        VALUES (new.id, new.title, new.description, new.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER movies_movie_fts_delete AFTER DELETE ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(movies_movie_fts, rowid, title, description, genre)
+        VALUES ('delete', old.id, old.title, old.description, old.genre);
+    END
+    """,
+    """
+    CREATE TRIGGER movies_movie_fts_update AFTER UPDATE OF title, description, genre ON movies_movie BEGIN
+        INSERT INTO movies_movie_fts(movies_movie_fts, rowid, title, description, genre)
+        VALUES ('delete', old.id, old.title, old.description, old.genre);
+        INSERT INTO movies_movie_fts(rowid, title, description, genre)
+        VALUES (new.id, new.title, new.description, new.genre);
+    END
+    """,
+    # Make the table's rank column bm25 with per-column weights
+    "INSERT INTO movies_movie_fts(movies_movie_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 5.0)')",
+    # Index the rows that already exist
+    "INSERT INTO movies_movie_fts(movies_movie_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS movies_movie_fts_insert',
+    'DROP TRIGGER IF EXISTS movies_movie_fts_delete',
+    'DROP TRIGGER IF EXISTS movies_movie_fts_update',
+    'DROP TABLE IF EXISTS movies_movie_fts',
+]
+
+
+def search_index():
+    """GIN index over the title (A), genre (B) and description (C) tsvector."""
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    vector = (
+        SearchVector('title', weight='A', config='english')
+        + SearchVector('genre', weight='B', config='english')
+        + SearchVector('description', weight='C', config='english')
+    )
+    return GinIndex(vector, name=GIN_INDEX)
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_INDEX_SQL:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('movies', 'Movie'), search_index(), concurrently=True)
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_DROP_SQL:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('movies', 'Movie'), search_index(), concurrently=True)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0005_booking_created_id_index'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['genre'], name='movie_genre_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['rating'], name='movie_rating_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='movie',
+            index=models.Index(fields=['release_date'], name='movie_release_date_idx'),
+        ),
+        # SQLite FTS5 table and triggers, or a PostgreSQL GIN tsvector index
+        migrations.RunPython(create_index, drop_index),
+    ]
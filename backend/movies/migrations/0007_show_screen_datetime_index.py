@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:25
+
+from django.db import migrations, models
+
+from movies.operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('movies', '0006_movie_search'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='show',
+            index=models.Index(fields=['screen_name', 'date_time'], name='show_screen_datetime_idx'),
+        ),
+    ]
@@ -1,6 +1,29 @@
-from django.db import models
+import threading
+from collections import defaultdict
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models import Count, Q
+from django.db.models.functions import Now, TruncDate
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from . import seatmap
+from .signals import seats_changed
+
+
+class MovieQuerySet(models.QuerySet):
+    """
+    Query helpers for movie listings.
+    """
+
+    def with_show_counts(self):
+        """Annotate total and upcoming show counts in the same query."""
+        return self.annotate(
+            shows_count=Count('shows'),
+            upcoming_shows_count=Count('shows', filter=Q(shows__date_time__gte=Now())),
+        )
 
 
 class Movie(models.Model):
@@ -26,13 +49,45 @@ class Movie(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MovieQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Search filters (MovieSearchView); the full-text index itself is
+            # backend-specific and created in migration 0006 (see search.py)
+            models.Index(fields=['genre'], name='movie_genre_idx'),
+            models.Index(fields=['rating'], name='movie_rating_idx'),
+            models.Index(fields=['release_date'], name='movie_release_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.duration_minutes} mins)"
 
 
+class ShowQuerySet(models.QuerySet):
+    """
+    Query helpers for show listings.
+    """
+
+    def for_listing(self):
+        """Join the movie so ShowSerializer needs no per-show queries."""
+        return self.select_related('movie')
+
+    def in_window(self, start, end):
+        """Shows starting at or after ``start`` and before ``end``."""
+        return self.filter(date_time__gte=start, date_time__lt=end)
+
+    def day_counts(self):
+        """Count shows per day in the current time zone, in one aggregate query."""
+        return (
+            self.annotate(day=TruncDate('date_time'))
+            .values('day')
+            .annotate(count=Count('id'))
+            .order_by('day')
+        )
+
+
 class Show(models.Model):
     """
     Show model to store movie show information.
@@ -54,11 +109,26 @@ class Show(models.Model):
         decimal_places=2, 
         help_text="Ticket price"
     )
+    seat_map = models.BinaryField(
+        default=b'',
+        editable=False,
+        help_text="Occupancy bitmap; bit n-1 is set when seat n is booked"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ShowQuerySet.as_manager()
+
     class Meta:
         ordering = ['date_time']
+        indexes = [
+            # Shows of one movie in schedule order (MovieShowsView)
+            models.Index(fields=['movie', 'date_time'], name='show_movie_datetime_idx'),
+            # Keyset pagination over all shows (ShowCursorPagination)
+            models.Index(fields=['date_time', 'id'], name='show_datetime_id_idx'),
+            # Calendar of one screen (ShowCalendarView)
+            models.Index(fields=['screen_name', 'date_time'], name='show_screen_datetime_idx'),
+        ]
 
     def __str__(self):
         return f"{self.movie.title} - {self.screen_name} on {self.date_time}"
@@ -66,15 +136,52 @@ class Show(models.Model):
     @property
     def available_seats(self):
         """Calculate available seats for this show."""
-        booked_seats = self.bookings.filter(status='booked').count()
-        return self.total_seats - booked_seats
+        return self.total_seats - seatmap.count_booked(self.seat_map)
 
     @property
     def booked_seat_numbers(self):
         """Get list of booked seat numbers."""
-        return list(
+        return seatmap.booked_seats(self.seat_map)
+
+    def mark_seats(self, seat_numbers, booked=True, lock=False):
+        """
+        Set or clear seats in the occupancy bitmap and persist it.
+
+        Callers must hold the show row lock (``select_for_update``) on this
+        instance so concurrent bookings cannot overwrite each other's bits.
+        With ``lock=True`` the current bitmap is re-read under a row lock
+        first, for callers that did not lock the show up front.
+        """
+        if lock:
+            self.seat_map = (
+                Show.objects.select_for_update()
+                .values_list('seat_map', flat=True)
+                .get(pk=self.pk)
+            )
+        seat_map = seatmap.mark(self.seat_map, seat_numbers, booked)
+        if seat_map != bytes(self.seat_map or b''):
+            self.seat_map = seat_map
+            Show.objects.filter(pk=self.pk).update(seat_map=seat_map)
+            seats_changed.send(
+                sender=Show, show=self, seat_numbers=list(seat_numbers), booked=booked
+            )
+
+    def rebuild_seat_map(self):
+        """Recompute the occupancy bitmap from the booked rows."""
+        self.seat_map = seatmap.from_seats(
             self.bookings.filter(status='booked').values_list('seat_number', flat=True)
         )
+        Show.objects.filter(pk=self.pk).update(seat_map=self.seat_map)
+
+
+class BookingQuerySet(models.QuerySet):
+    """
+    Query helpers for booking listings.
+    """
+
+    def for_listing(self):
+        """Join the user, show and movie so BookingSerializer needs no per-booking queries."""
+        return self.select_related('user', 'show__movie')
 
 
 class Booking(models.Model):
@@ -111,10 +218,27 @@ class Booking(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
     class Meta:
-        # Ensure no duplicate seat booking for the same show
-        unique_together = ('show', 'seat_number')
         ordering = ['-created_at']
+        constraints = [
+            # Ensure no duplicate active booking for the same seat; cancelled
+            # rows do not block the seat from being sold again
+            models.UniqueConstraint(
+                fields=['show', 'seat_number'],
+                condition=Q(status='booked'),
+                name='unique_booked_seat_per_show',
+            ),
+        ]
+        indexes = [
+            # Booking checks and availability filter on (show, status)
+            models.Index(fields=['show', 'status'], name='booking_show_status_idx'),
+            # A user's bookings, newest first (UserBookingsView)
+            models.Index(fields=['user', '-created_at'], name='booking_user_created_idx'),
+            # Booking exports stream a date range in (created_at, id) order
+            models.Index(fields=['created_at', 'id'], name='booking_created_id_idx'),
+        ]
 
     def __str__(self):
         return f"Booking {self.id} - {self.user.username} - Seat {self.seat_number}"
@@ -130,7 +254,90 @@ class Booking(models.Model):
                     f"({self.show.total_seats}) for this show."
                 )
 
-    def save(self, *args, **kwargs):
-        """Override save to include validation."""
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded status so save() can detect transitions."""
+        instance = super().from_db(db, field_names, values)
+        if 'status' in field_names:
+            instance._loaded_status = values[field_names.index('status')]
+        return instance
+
+    def save(self, *args, show_locked=False, **kwargs):
+        """
+        Override save to include validation and keep the seat bitmap in sync.
+
+        Pass ``show_locked=True`` when ``self.show`` was loaded under the show
+        row lock in the current transaction; otherwise the bitmap is re-read
+        under the lock before it is updated.
+        """
         self.clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            was_booked = getattr(self, '_loaded_status', None) == 'booked'
+            is_booked = self.status == 'booked'
+            if was_booked != is_booked:
+                self.show.mark_seats([self.seat_number], booked=is_booked, lock=not show_locked)
+        self._loaded_status = self.status
+
+
+class _DeleteBatch:
+    """
+    Seats freed by one ``delete()`` call, released together at its end.
+
+    Django sends ``pre_delete`` for every collected object before deleting
+    anything, then ``post_delete`` per object: the batch counts booked rows
+    on the way in and, at the last of their ``post_delete`` signals, updates
+    each affected show's bitmap once. Shows deleted by the same call are
+    skipped.
+    """
+
+    def __init__(self, origin):
+        self.origin = origin
+        self.seats = defaultdict(list)
+        self.deleted_shows = set()
+        self.pending = 0
+
+    def release(self):
+        for show_id, seat_numbers in self.seats.items():
+            if show_id in self.deleted_shows:
+                continue
+            show = Show.objects.select_for_update().get(pk=show_id)
+            show.mark_seats(seat_numbers, booked=False)
+
+
+_delete_state = threading.local()
+
+
+def _delete_batch(origin):
+    """The batch of the ``delete()`` call ``origin``, starting a new one if needed."""
+    batch = getattr(_delete_state, 'batch', None)
+    if batch is None or batch.origin is not origin:
+        # A previous delete that was rolled back before finishing is discarded
+        batch = _delete_state.batch = _DeleteBatch(origin)
+    return batch
+
+
+@receiver(pre_delete, sender=Show)
+def skip_deleted_show(sender, instance, origin=None, **kwargs):
+    _delete_batch(origin).deleted_shows.add(instance.pk)
+
+
+@receiver(pre_delete, sender=Booking)
+def collect_deleted_seat(sender, instance, origin=None, **kwargs):
+    """Queue the seat of a booked row deleted directly, by a cascade or in bulk."""
+    if getattr(instance, '_loaded_status', instance.status) == 'booked':
+        batch = _delete_batch(origin)
+        batch.seats[instance.show_id].append(instance.seat_number)
+        batch.pending += 1
+
+
+@receiver(post_delete, sender=Booking)
+def release_deleted_seats(sender, instance, origin=None, **kwargs):
+    if getattr(instance, '_loaded_status', instance.status) != 'booked':
+        return
+    batch = _delete_batch(origin)
+    batch.pending -= 1
+    if batch.pending == 0:
+        del _delete_state.batch
+        batch.release()
@@ -0,0 +1,89 @@
+"""
+Migration operations that are safe to run against large, busy tables.
+
+On PostgreSQL, indexes are built with ``CREATE INDEX CONCURRENTLY`` so reads
+and writes (including bookings) continue while the index is built. Other
+backends fall back to the regular statements. Migrations using these
+operations must set ``atomic = False``, since PostgreSQL refuses to build
+indexes concurrently inside a transaction.
+
+``django.contrib.postgres`` imports psycopg, which only PostgreSQL setups
+install, so its operations are imported when a migration runs on PostgreSQL.
+"""
+from django.db import migrations, models
+
+
+def _is_postgresql(schema_editor):
+    return schema_editor.connection.vendor == 'postgresql'
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    Add an index without blocking writes on PostgreSQL.
+
+    Runs ``django.contrib.postgres``'s ``AddIndexConcurrently`` there and a
+    plain ``AddIndex`` elsewhere.
+    """
+
+    def postgres_operation(self):
+        from django.contrib.postgres.operations import AddIndexConcurrently
+
+        return AddIndexConcurrently(self.model_name, self.index)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if _is_postgresql(schema_editor):
+            self.postgres_operation().database_forwards(app_label, schema_editor, from_state, to_state)
+        else:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if _is_postgresql(schema_editor):
+            self.postgres_operation().database_backwards(app_label, schema_editor, from_state, to_state)
+        else:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+    def describe(self):
+        return super().describe() + " (concurrently)"
+
+
+class AddConstraintConcurrently(migrations.AddConstraint):
+    """
+    Add a conditional unique constraint without blocking writes on PostgreSQL.
+
+    PostgreSQL implements a conditional unique constraint as a partial unique
+    index, so its index is built concurrently under the constraint's name and
+    that index is the constraint ``AddConstraint`` records. Other backends,
+    and unconditional constraints, are added the regular way.
+    """
+    sql_create_unique_index_concurrently = (
+        "CREATE UNIQUE INDEX CONCURRENTLY %(name)s ON %(table)s%(using)s "
+        "(%(columns)s)%(include)s%(extra)s%(condition)s"
+    )
+
+    def builds_concurrently(self, schema_editor):
+        return _is_postgresql(schema_editor) and getattr(self.constraint, 'condition', None) is not None
+
+    def unique_index(self):
+        """The partial index enforcing the constraint."""
+        return models.Index(
+            fields=self.constraint.fields, condition=self.constraint.condition, name=self.constraint.name
+        )
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not self.builds_concurrently(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(
+                self.unique_index().create_sql(model, schema_editor, sql=self.sql_create_unique_index_concurrently)
+            )
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not self.builds_concurrently(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.execute(self.unique_index().remove_sql(model, schema_editor, concurrently=True))
+
+    def describe(self):
+        return super().describe() + " (concurrently)"
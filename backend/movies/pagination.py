@@ -0,0 +1,65 @@
+"""
+Pagination for list endpoints.
+
+Every list accepts ``?page_size=`` (up to ``MAX_PAGE_SIZE``) to override the
+default ``PAGE_SIZE``.
+
+Keyset (cursor) pagination for show and booking lists:
+
+Page-number pagination runs ``COUNT(*)`` on every page and skips rows with
+``OFFSET``, so deep pages get slower. Cursor pagination seeks straight to the
+position encoded in the cursor using the indexed ordering columns, so every
+page costs the same. Views opt in through ``CursorPaginationOptInMixin``;
+clients opt in per request with ``?pagination=cursor`` and then follow the
+``next``/``previous`` links.
+"""
+from rest_framework import pagination
+
+PAGE_SIZE_QUERY_PARAM = 'page_size'
+MAX_PAGE_SIZE = 100
+
+# Every query parameter the list pagination reads
+QUERY_PARAMS = ('page', PAGE_SIZE_QUERY_PARAM, 'pagination', 'cursor')
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """Page-number pagination with a client-selected page size."""
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    max_page_size = MAX_PAGE_SIZE
+
+
+class CursorPagination(pagination.CursorPagination):
+    """Cursor pagination with a client-selected page size."""
+    page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    max_page_size = MAX_PAGE_SIZE
+
+
+class ShowCursorPagination(CursorPagination):
+    """Shows in schedule order, keyed on ``(date_time, id)``."""
+    ordering = ('date_time', 'id')
+
+
+class BookingCursorPagination(CursorPagination):
+    """Bookings newest first, keyed on ``(created_at, id)``."""
+    ordering = ('-created_at', '-id')
+
+
+class CursorPaginationOptInMixin:
+    """
+    Switch a list view to ``cursor_pagination_class`` when the client asks.
+
+    The view keeps its default pagination unless the request carries
+    ``?pagination=cursor`` or a ``cursor`` parameter from a previous page.
+    """
+    cursor_pagination_class = None
+
+    def use_cursor_pagination(self):
+        params = self.request.query_params
+        return 'cursor' in params or params.get('pagination') == 'cursor'
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.cursor_pagination_class and self.use_cursor_pagination():
+                self._paginator = self.cursor_pagination_class()
+        return super().paginator
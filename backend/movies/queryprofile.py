@@ -0,0 +1,82 @@
+"""
+Query-count and query-plan profiling for API endpoints.
+
+``profile_request`` issues a GET through a test client and records every SQL
+statement it ran. The resulting ``EndpointProfile`` reports the query count
+and the database's plan (``EXPLAIN``) for each SELECT, so tests can assert
+that an endpoint's query count does not grow with its page size and that its
+hot queries keep using their indexes.
+
+On PostgreSQL sequential scans are disabled while explaining, so plans show
+the index the planner would pick for a production-sized table rather than a
+scan of a tiny test table.
+"""
+import json
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+def explain(sql):
+    """Return the query plan of an SQL statement as text."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        else:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql)
+        # SQLite's plan detail and PostgreSQL's plan line are the last column
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+class EndpointProfile:
+    """
+    The SQL statements run by one request, with their plans.
+    """
+
+    def __init__(self, url, response, captured_queries):
+        self.url = url
+        self.response = response
+        self.queries = [query['sql'] for query in captured_queries]
+        self._plans = None
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    @property
+    def plans(self):
+        """Map each SELECT statement to its plan, explaining on first access."""
+        if self._plans is None:
+            self._plans = {
+                sql: explain(sql)
+                for sql in self.queries
+                if sql.lstrip().upper().startswith('SELECT')
+            }
+        return self._plans
+
+    def uses_index(self, index_name):
+        """Whether any of the request's SELECTs is planned to use ``index_name``."""
+        return any(index_name in plan for plan in self.plans.values())
+
+    def as_dict(self):
+        return {
+            'url': self.url,
+            'status_code': self.response.status_code,
+            'query_count': self.query_count,
+            'queries': [{'sql': sql, 'plan': self.plans.get(sql)} for sql in self.queries],
+        }
+
+
+def profile_request(client, url, **extra):
+    """GET ``url`` with ``client`` and return the request's ``EndpointProfile``."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, **extra)
+    return EndpointProfile(url, response, context.captured_queries)
+
+
+def write_report(profiles, path):
+    """Save profiles as JSON for comparison across commits."""
+    with open(path, 'w') as output:
+        json.dump([profile.as_dict() for profile in profiles], output, indent=2)
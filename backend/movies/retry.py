@@ -0,0 +1,188 @@
+"""
+Retry policy for transient database errors in booking transactions.
+
+Only lock contention that can clear on a second try is retried: on
+PostgreSQL serialization failures (SQLSTATE 40001), deadlocks (40P01) and
+lock-not-available (55P03); on SQLite "database is locked". A statement
+cancelled by ``statement_timeout`` (57014), or a "database is locked" that
+already waited out the whole SQLite busy timeout, has used up the request's
+time budget: it is given up on at once instead of waiting that long again.
+Seat conflicts (``IntegrityError``) and other database errors are returned
+to the caller immediately.
+
+Backoff uses "full jitter" (a random delay between zero and an exponentially
+growing cap) with a low ceiling, so a worker spends at most a few tens of
+milliseconds asleep before giving up and telling the client when to retry.
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_ATTEMPTS': 3,
+    'BACKOFF_BASE_SECONDS': 0.01,
+    'BACKOFF_MAX_SECONDS': 0.05,
+    'RETRY_AFTER_SECONDS': 1,
+}
+
+# Serialization failure, deadlock detected, lock not available
+TRANSIENT_SQLSTATES = {'40001', '40P01', '55P03'}
+# Query cancelled, i.e. statement_timeout expired
+TIMEOUT_SQLSTATES = {'57014'}
+SQLITE_LOCKED_MESSAGES = ('database is locked', 'database table is locked')
+
+# sqlite3.connect()'s default busy timeout
+SQLITE_DEFAULT_TIMEOUT = 5.0
+
+
+def sqlstate(exc):
+    """The SQLSTATE of the driver error behind ``exc``, if it has one."""
+    cause = exc.__cause__
+    # psycopg 3 names it sqlstate, psycopg2 pgcode
+    return getattr(cause, 'sqlstate', None) or getattr(cause, 'pgcode', None)
+
+
+def sqlite_busy_timeout(alias=DEFAULT_DB_ALIAS):
+    """Seconds SQLite waits for a lock on ``alias``, or None for other backends."""
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        return None
+    return connection.settings_dict.get('OPTIONS', {}).get('timeout', SQLITE_DEFAULT_TIMEOUT)
+
+
+class RetryStats:
+    """
+    Thread-safe counters for retry outcomes.
+
+    ``metric``, if given, is a Prometheus counter labelled by field that is
+    incremented alongside.
+    """
+
+    FIELDS = ('attempts', 'retries', 'give_ups')
+
+    def __init__(self, metric=None):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self.metric = metric
+
+    def increment(self, field):
+        with self._lock:
+            self._counts[field] += 1
+        if self.metric is not None:
+            self.metric.labels(field).inc()
+
+    def snapshot(self):
+        """Return a copy of the current counters."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+
+
+class RetriesExhausted(Exception):
+    """Raised when a transient error persists after the last attempt."""
+
+    def __init__(self, last_exc, retry_after):
+        self.last_exc = last_exc
+        self.retry_after = retry_after
+        super().__init__(str(last_exc))
+
+
+class RetryPolicy:
+    """
+    Run a callable, retrying it on transient database errors.
+
+    ``busy_timeout`` is the SQLite busy timeout in seconds: an attempt that
+    ran at least that long before "database is locked" has already waited
+    for the lock in full and is not retried.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.01, backoff_max=0.05,
+                 retry_after=1, stats=None, busy_timeout=None):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after = retry_after
+        self.stats = stats if stats is not None else RetryStats()
+        self.busy_timeout = busy_timeout
+
+    def is_transient(self, exc):
+        """Whether ``exc`` is lock contention that may clear on a retry."""
+        if not isinstance(exc, OperationalError):
+            return False
+        code = sqlstate(exc)
+        if code is not None:
+            return code in TRANSIENT_SQLSTATES
+        return any(message in str(exc) for message in SQLITE_LOCKED_MESSAGES)
+
+    def is_timed_out(self, exc, elapsed):
+        """
+        Whether ``exc``, raised ``elapsed`` seconds into the attempt, ended a
+        wait that already ran for the database's whole timeout.
+        """
+        if not isinstance(exc, OperationalError):
+            return False
+        code = sqlstate(exc)
+        if code is not None:
+            return code in TIMEOUT_SQLSTATES
+        # SQLite reports "locked" at once for lock upgrades it cannot wait
+        # on; only one that comes after the busy timeout has waited in full.
+        return (self.is_transient(exc) and self.busy_timeout is not None
+                and elapsed >= self.busy_timeout)
+
+    def backoff(self, attempt):
+        """Jittered delay before retry number ``attempt`` (1-based)."""
+        cap = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    def run(self, func):
+        """
+        Call ``func`` until it succeeds, fails permanently or runs out of attempts.
+
+        Non-transient exceptions propagate unchanged. When the last attempt
+        fails transiently, or any attempt times out waiting for a lock,
+        ``RetriesExhausted`` is raised.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            self.stats.increment('attempts')
+            started = time.monotonic()
+            try:
+                return func()
+            except Exception as exc:
+                timed_out = self.is_timed_out(exc, time.monotonic() - started)
+                if not timed_out and not self.is_transient(exc):
+                    raise
+                if timed_out or attempt == self.max_attempts:
+                    self.stats.increment('give_ups')
+                    logger.warning("Giving up after %d attempts: %s", attempt, exc)
+                    raise RetriesExhausted(exc, self.retry_after) from exc
+                self.stats.increment('retries')
+                delay = self.backoff(attempt)
+                if delay:
+                    time.sleep(delay)
+
+
+booking_retry_stats = RetryStats(metric=metrics.BOOKING_RETRY_EVENTS)
+
+
+def booking_retry_policy():
+    """Build the booking retry policy from ``settings.BOOKING_RETRY``."""
+    options = {**DEFAULTS, **getattr(settings, 'BOOKING_RETRY', {})}
+    return RetryPolicy(
+        max_attempts=options['MAX_ATTEMPTS'],
+        backoff_base=options['BACKOFF_BASE_SECONDS'],
+        backoff_max=options['BACKOFF_MAX_SECONDS'],
+        retry_after=options['RETRY_AFTER_SECONDS'],
+        stats=booking_retry_stats,
+        busy_timeout=sqlite_busy_timeout(),
+    )
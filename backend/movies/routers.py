@@ -0,0 +1,101 @@
+"""
+Read-replica routing for catalogue traffic.
+
+Writes and ordinary reads go to the ``default`` (primary) database. Views
+that opt in with ``ReplicaReadMixin`` send their safe-method reads to one of
+``settings.DATABASE_REPLICAS``, so catalogue listings stop competing with the
+row locks taken by bookings.
+
+Two rules keep this safe:
+
+* Reads inside a transaction on the primary stay on the primary, so the
+  booking and cancel transactions never see replica data.
+* After a user books or cancels, ``stick_to_primary`` pins that user's reads
+  to the primary for ``REPLICA_STICKY_SECONDS``, long enough for the replicas
+  to catch up, so users always see their own writes.
+
+Cache misses in these views are rebuilt from the replica too. What a
+replica read puts in the catalogue cache is kept for only
+``REPLICA_CACHE_TIMEOUT`` seconds, so a lagging replica cannot outlast an
+invalidation by more than that (see ``movies/cache.py``).
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Database alias the current request reads from; None means the primary
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def sticky_key(user_id):
+    return f'primary-pin:{user_id}'
+
+
+def stick_to_primary(user):
+    """Route ``user``'s replica reads to the primary for a while after a write."""
+    if user.is_authenticated and get_replicas():
+        cache.set(
+            sticky_key(user.pk), True,
+            getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+        )
+
+
+def is_stuck_to_primary(user):
+    return user.is_authenticated and cache.get(sticky_key(user.pk)) is not None
+
+
+def reading_from_replica():
+    """Whether reads in the current context are routed to a replica."""
+    return _read_alias.get() is not None and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+
+
+class ReplicaRouter:
+    """
+    Route reads to the alias chosen for the current request.
+    """
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in get_replicas()
+
+
+class ReplicaReadMixin:
+    """
+    Serve a view's safe-method reads from a replica.
+
+    The replica is picked once per request, after authentication, unless the
+    user has written recently and is stuck to the primary.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        token = _read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        replicas = get_replicas()
+        if replicas and request.method in SAFE_METHODS and not is_stuck_to_primary(request.user):
+            _read_alias.set(random.choice(replicas))
@@ -0,0 +1,126 @@
+"""
+Full-text movie search.
+
+Titles, descriptions and genres are indexed by the database itself:
+
+* SQLite -- an FTS5 external-content table (``movies_movie_fts``) kept in
+  sync with ``movies_movie`` by triggers, ranked with ``bm25``;
+* PostgreSQL -- a GIN index over a weighted ``tsvector`` expression, ranked
+  with ``ts_rank``.
+
+Both are created by migration ``0006_movie_search``, which keeps its own copy
+of their definitions, and follow every insert, update and delete, including
+bulk writes that skip model signals. Other backends fall back to unindexed
+``icontains`` matching.
+
+Each word of the query must match, as a prefix, so partial input such as
+``"dark kni"`` already finds "The Dark Knight". Title matches rank above
+genre matches, which rank above description matches.
+"""
+import re
+from datetime import date
+from decimal import Decimal, InvalidOperation
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = 'movies_movie_fts'
+GIN_INDEX = 'movie_search_idx'
+
+# tsvector weights per field, as indexed by migration 0006_movie_search
+TSVECTOR_WEIGHTS = {'title': 'A', 'genre': 'B', 'description': 'C'}
+TSVECTOR_CONFIG = 'english'
+
+
+def search_terms(text):
+    """Split search input into lowercase words, dropping FTS syntax."""
+    return re.findall(r'\w+', text.lower())
+
+
+def search_vector():
+    """The weighted ``tsvector`` expression covered by the PostgreSQL GIN index."""
+    from django.contrib.postgres.search import SearchVector
+
+    vector = None
+    for field, weight in TSVECTOR_WEIGHTS.items():
+        field_vector = SearchVector(field, weight=weight, config=TSVECTOR_CONFIG)
+        vector = field_vector if vector is None else vector + field_vector
+    return vector
+
+
+def search(queryset, text):
+    """
+    Filter a movie queryset to full-text matches of ``text``, best first.
+
+    Returns the queryset unchanged when ``text`` has no words.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        return _sqlite_search(queryset, terms)
+    if vendor == 'postgresql':
+        return _postgresql_search(queryset, terms)
+    return _fallback_search(queryset, terms)
+
+
+def apply_filters(queryset, params):
+    """
+    Apply the indexed ``genre``, rating range and release date range filters.
+
+    Raises ``ValueError`` with a message for the client on invalid input.
+    """
+    if params.get('genre'):
+        queryset = queryset.filter(genre=params['genre'])
+    for name, lookup in (('rating_min', 'rating__gte'), ('rating_max', 'rating__lte')):
+        if params.get(name):
+            try:
+                queryset = queryset.filter(**{lookup: Decimal(params[name])})
+            except InvalidOperation:
+                raise ValueError(f'{name} must be a number.')
+    for name, lookup in (('released_from', 'release_date__gte'), ('released_to', 'release_date__lte')):
+        if params.get(name):
+            try:
+                queryset = queryset.filter(**{lookup: date.fromisoformat(params[name])})
+            except ValueError:
+                raise ValueError(f'{name} must be a date in YYYY-MM-DD format.')
+    return queryset
+
+
+def _sqlite_search(queryset, terms):
+    # Quote every word so FTS5 operators in user input are matched literally
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # The FTS table has no model, so it is joined with extra(). Its rank
+    # column is bm25, which is negative: lower is a better match.
+    return queryset.extra(
+        select={'search_rank': f'{FTS_TABLE}.rank'},
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = movies_movie.id', f'{FTS_TABLE} MATCH %s'],
+        params=[match],
+    ).order_by('search_rank', 'id')
+
+
+def _postgresql_search(queryset, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    query = SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms), search_type='raw', config=TSVECTOR_CONFIG
+    )
+    # Filtering on the exact indexed expression lets the planner use the GIN index
+    vector = search_vector()
+    return (
+        queryset.annotate(search_document=vector)
+        .filter(search_document=query)
+        .annotate(search_rank=SearchRank(vector, query))
+        .order_by('-search_rank', 'id')
+    )
+
+
+def _fallback_search(queryset, terms):
+    for term in terms:
+        queryset = queryset.filter(
+            Q(title__icontains=term) | Q(genre__icontains=term) | Q(description__icontains=term)
+        )
+    return queryset.order_by('title', 'id')
+
@@ -0,0 +1,106 @@
+"""
+Compact seat occupancy bitmaps for shows.
+
+Seat ``n`` (1-based) is stored in bit ``(n - 1) % 8`` of byte ``(n - 1) // 8``,
+i.e. the bitmap is a little-endian integer whose bit ``n - 1`` is set when the
+seat is booked. A show with the maximum of 1000 seats needs at most 125 bytes.
+"""
+import base64
+
+
+def _as_int(seat_map):
+    """Interpret a stored bitmap (bytes, memoryview or None) as an integer."""
+    return int.from_bytes(bytes(seat_map or b''), 'little')
+
+
+def _as_bytes(value):
+    """Encode an integer bitmap as the shortest little-endian byte string."""
+    return value.to_bytes((value.bit_length() + 7) // 8, 'little')
+
+
+def from_seats(seat_numbers):
+    """Build a bitmap with the given seats marked as booked."""
+    value = 0
+    for seat_number in seat_numbers:
+        value |= 1 << (seat_number - 1)
+    return _as_bytes(value)
+
+
+def mark(seat_map, seat_numbers, booked=True):
+    """Return a copy of ``seat_map`` with the given seats set or cleared."""
+    value = _as_int(seat_map)
+    mask = _as_int(from_seats(seat_numbers))
+    value = value | mask if booked else value & ~mask
+    return _as_bytes(value)
+
+
+def is_booked(seat_map, seat_number):
+    """Check whether a single seat is marked as booked."""
+    return bool(_as_int(seat_map) >> (seat_number - 1) & 1)
+
+
+def count_booked(seat_map):
+    """Number of booked seats (popcount of the bitmap)."""
+    return _as_int(seat_map).bit_count()
+
+
+def booked_seats(seat_map):
+    """Sorted list of booked seat numbers."""
+    value = _as_int(seat_map)
+    seats = []
+    seat_number = 1
+    while value:
+        if value & 1:
+            seats.append(seat_number)
+        value >>= 1
+        seat_number += 1
+    return seats
+
+
+def to_base64(seat_map, total_seats):
+    """Encode the bitmap as base64, padded to the show's full byte length."""
+    raw = bytes(seat_map or b'').ljust((total_seats + 7) // 8, b'\0')
+    return base64.b64encode(raw).decode('ascii')
+
+
+def to_rle(seat_map, total_seats):
+    """
+    Encode the bitmap as run lengths over seats 1..total_seats.
+
+    Runs alternate between free and booked seats and always start with a
+    (possibly empty) free run, e.g. ``[2, 3, 5]`` for a 10-seat show with
+    seats 3-5 booked.
+    """
+    value = _as_int(seat_map)
+    runs = []
+    current, length = 0, 0
+    for bit_index in range(total_seats):
+        bit = value >> bit_index & 1
+        if bit == current:
+            length += 1
+        else:
+            runs.append(length)
+            current, length = bit, 1
+    runs.append(length)
+    return runs
+
+
+ENCODINGS = {
+    'base64': to_base64,
+    'rle': to_rle,
+}
+
+
+def seat_fields(seat_map, total_seats, seat_format='list'):
+    """
+    Availability fields of a show as returned by the API.
+
+    ``seat_format`` is ``'list'`` for ``booked_seat_numbers`` or one of
+    ``ENCODINGS`` for an encoded ``seat_map``.
+    """
+    fields = {'available_seats': total_seats - count_booked(seat_map)}
+    if seat_format in ENCODINGS:
+        fields['seat_map'] = ENCODINGS[seat_format](seat_map, total_seats)
+    else:
+        fields['booked_seat_numbers'] = booked_seats(seat_map)
+    return fields
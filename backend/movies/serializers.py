@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
-from django.db import transaction
+from django.utils import timezone
+from . import booking, seatmap
 from .models import Movie, Show, Booking
 
 
@@ -83,20 +84,37 @@ class MovieSerializer(serializers.ModelSerializer):
     Serializer for Movie model.
     """
     shows_count = serializers.SerializerMethodField()
+    upcoming_shows_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Movie
         fields = [
             'id', 'title', 'duration_minutes', 'description', 
             'genre', 'rating', 'release_date', 'shows_count',
-            'created_at', 'updated_at'
+            'upcoming_shows_count', 'created_at', 'updated_at'
         ]
         read_only_fields = ('id', 'created_at', 'updated_at')
 
     def get_shows_count(self, obj):
-        """Get total number of shows for this movie."""
+        """Get total number of shows, preferring the queryset annotation."""
+        if hasattr(obj, 'shows_count'):
+            return obj.shows_count
         return obj.shows.count()
 
+    def get_upcoming_shows_count(self, obj):
+        """Get number of shows that have not started yet."""
+        if hasattr(obj, 'upcoming_shows_count'):
+            return obj.upcoming_shows_count
+        return obj.shows.filter(date_time__gte=timezone.now()).count()
+
+
+def get_seat_format(request):
+    """Seat encoding requested via ``?seat_format=``; ``'list'`` unless valid."""
+    # DRF requests expose query_params, plain Django (async) requests GET
+    params = getattr(request, 'query_params', None) or getattr(request, 'GET', {})
+    seat_format = params.get('seat_format')
+    return seat_format if seat_format in seatmap.ENCODINGS else 'list'
+
 
 class ShowSerializer(serializers.ModelSerializer):
     """
@@ -105,16 +123,35 @@ class ShowSerializer(serializers.ModelSerializer):
     movie_title = serializers.CharField(source='movie.title', read_only=True)
     available_seats = serializers.ReadOnlyField()
     booked_seat_numbers = serializers.ReadOnlyField()
+    seat_map = serializers.SerializerMethodField()
     
     class Meta:
         model = Show
         fields = [
             'id', 'movie', 'movie_title', 'screen_name', 'date_time', 
             'total_seats', 'available_seats', 'price', 'booked_seat_numbers',
-            'created_at', 'updated_at'
+            'seat_map', 'created_at', 'updated_at'
         ]
         read_only_fields = ('id', 'created_at', 'updated_at')
 
+    @property
+    def seat_format(self):
+        """Seat encoding requested via ``?seat_format=list|base64|rle``."""
+        return get_seat_format(self.context.get('request'))
+
+    def get_fields(self):
+        """Send either the booked seat list or the encoded bitmap, not both."""
+        fields = super().get_fields()
+        if self.seat_format == 'list':
+            fields.pop('seat_map')
+        else:
+            fields.pop('booked_seat_numbers')
+        return fields
+
+    def get_seat_map(self, obj):
+        """Encode the occupancy bitmap in the requested format."""
+        return seatmap.ENCODINGS[self.seat_format](obj.seat_map, obj.total_seats)
+
 
 class BookingSerializer(serializers.ModelSerializer):
     """
@@ -175,60 +212,68 @@ class BookingSerializer(serializers.ModelSerializer):
 class SeatBookingSerializer(serializers.Serializer):
     """
     Serializer for seat booking request.
+
+    Expects the show loaded by ``booking.load_show`` in ``context['show']`` so
+    validation and creation run without loading the show again.
     """
     seat_number = serializers.IntegerField(min_value=1)
 
     def validate_seat_number(self, value):
-        """Validate seat number against show capacity."""
-        show_id = self.context.get('show_id')
-        if show_id:
-            try:
-                show = Show.objects.get(id=show_id)
-                if value > show.total_seats:
-                    raise serializers.ValidationError(
-                        f"Seat number {value} exceeds total seats ({show.total_seats}) for this show."
-                    )
-                
-                # Check if seat is already booked
-                if Booking.objects.filter(
-                    show=show, 
-                    seat_number=value, 
-                    status='booked'
-                ).exists():
-                    raise serializers.ValidationError("This seat is already booked.")
-                    
-            except Show.DoesNotExist:
-                raise serializers.ValidationError("Invalid show.")
+        """Validate seat number against show capacity and the seat bitmap."""
+        show = self.context.get('show')
+        if show:
+            if value > show.total_seats:
+                raise serializers.ValidationError(
+                    f"Seat number {value} exceeds total seats ({show.total_seats}) for this show."
+                )
+
+            # Check if seat is already booked
+            if booking.unavailable_seats(show, [value]):
+                raise serializers.ValidationError("This seat is already booked.")
         return value
 
     def create(self, validated_data):
-        """Create a new booking with transaction safety."""
-        show_id = self.context.get('show_id')
-        user = self.context.get('user')
-        
-        try:
-            with transaction.atomic():
-                show = Show.objects.select_for_update().get(id=show_id)
-                
-                # Double-check seat availability within transaction
-                if Booking.objects.filter(
-                    show=show,
-                    seat_number=validated_data['seat_number'],
-                    status='booked'
-                ).exists():
-                    raise serializers.ValidationError("Seat already booked.")
-                
-                # Create the booking
-                booking = Booking.objects.create(
-                    user=user,
-                    show=show,
-                    seat_number=validated_data['seat_number'],
-                    status='booked'
+        """Create the booking on the loaded show."""
+        return booking.create_bookings(
+            validated_data['user'],
+            self.context['show'],
+            [validated_data['seat_number']]
+        )[0]
+
+
+class BatchSeatBookingSerializer(serializers.Serializer):
+    """
+    Serializer for a multi-seat booking request.
+    """
+    MAX_SEATS = 20
+
+    seat_numbers = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_SEATS
+    )
+
+    def validate_seat_numbers(self, value):
+        """Reject duplicate seats and seats beyond the show's capacity."""
+        if len(set(value)) != len(value):
+            raise serializers.ValidationError("Duplicate seat numbers are not allowed.")
+
+        show = self.context.get('show')
+        if show:
+            out_of_range = [seat for seat in value if seat > show.total_seats]
+            if out_of_range:
+                raise serializers.ValidationError(
+                    f"Seat numbers {out_of_range} exceed total seats ({show.total_seats}) for this show."
                 )
-                return booking
-                
-        except Show.DoesNotExist:
-            raise serializers.ValidationError("Show not found.")
+        return sorted(value)
+
+    def create(self, validated_data):
+        """Create all bookings on the loaded show."""
+        return booking.create_bookings(
+            validated_data['user'],
+            self.context['show'],
+            validated_data['seat_numbers']
+        )
 
 
 class UserProfileSerializer(serializers.ModelSerializer):
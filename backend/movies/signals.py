@@ -0,0 +1,10 @@
+"""
+Custom signals sent by the movies app.
+"""
+from django.dispatch import Signal
+
+# Sent by ``Show.mark_seats`` after a show's seat bitmap was written, inside
+# the booking or cancel transaction. Receivers that act on committed state
+# should defer their work with ``transaction.on_commit``.
+# Arguments: ``show``, ``seat_numbers``, ``booked``.
+seats_changed = Signal()
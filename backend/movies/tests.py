@@ -1,13 +1,66 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
-from rest_framework.test import APITestCase
+from django.db import (
+    DEFAULT_DB_ALIAS, IntegrityError, OperationalError, close_old_connections, connection, connections,
+    transaction,
+)
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from prometheus_client import REGISTRY
 from datetime import datetime, timedelta
 from django.utils import timezone
 
+from . import events, search, seatmap
+from .cache import seats_key
+from .benchmark import percentile, run_benchmark
+from .datagen import create_users, generate
+from .booking import set_statement_timeout
+from .queryprofile import profile_request, write_report
+from .metrics import update_pool_gauges
 from .models import Movie, Show, Booking
+from .retry import RetryPolicy, RetriesExhausted
+from .routers import ReplicaRouter, _read_alias, is_stuck_to_primary
+
+
+class SeatMapTest(TestCase):
+    """Test cases for the seat occupancy bitmap helpers."""
+
+    def test_mark_and_count(self):
+        """Test setting, clearing and counting seats."""
+        seat_map = seatmap.mark(b'', [1, 9, 1000])
+        self.assertEqual(len(seat_map), 125)
+        self.assertEqual(seatmap.count_booked(seat_map), 3)
+        self.assertEqual(seatmap.booked_seats(seat_map), [1, 9, 1000])
+        self.assertTrue(seatmap.is_booked(seat_map, 9))
+
+        seat_map = seatmap.mark(seat_map, [1000], booked=False)
+        self.assertEqual(seatmap.booked_seats(seat_map), [1, 9])
+        self.assertEqual(len(seat_map), 2)
+
+    def test_encodings(self):
+        """Test base64 and run-length encodings."""
+        seat_map = seatmap.from_seats([3, 4, 5])
+        self.assertEqual(seatmap.to_rle(seat_map, 10), [2, 3, 5])
+        self.assertEqual(seatmap.to_rle(b'', 4), [4])
+        self.assertEqual(seatmap.to_base64(seat_map, 10), 'HAA=')
 
 
 class MovieModelTest(TestCase):
@@ -34,6 +87,92 @@ class MovieModelTest(TestCase):
         self.assertEqual(self.movie.rating, 8.5)
 
 
+class RetryPolicyTest(TestCase):
+    """Test cases for the booking retry policy."""
+
+    def setUp(self):
+        self.policy = RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0)
+
+    def test_transient_errors_are_retried(self):
+        """Test that OperationalError is retried until it succeeds."""
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError("database is locked")
+            return 'ok'
+
+        self.assertEqual(self.policy.run(flaky), 'ok')
+        self.assertEqual(self.policy.stats.snapshot(), {'attempts': 3, 'retries': 2, 'give_ups': 0})
+
+    def test_seat_conflicts_are_not_retried(self):
+        """Test that IntegrityError propagates after a single attempt."""
+
+        def conflict():
+            raise IntegrityError("UNIQUE constraint failed")
+
+        with self.assertRaises(IntegrityError):
+            self.policy.run(conflict)
+        self.assertEqual(self.policy.stats.snapshot()['attempts'], 1)
+
+    def test_give_up_after_max_attempts(self):
+        """Test that persistent transient errors raise RetriesExhausted."""
+
+        def locked():
+            raise OperationalError("database is locked")
+
+        with self.assertRaises(RetriesExhausted), self.assertLogs('movies.retry', 'WARNING'):
+            self.policy.run(locked)
+        self.assertEqual(self.policy.stats.snapshot(), {'attempts': 3, 'retries': 2, 'give_ups': 1})
+
+    def test_only_lock_contention_is_retried(self):
+        """Test that other OperationalErrors propagate after a single attempt."""
+
+        def broken():
+            raise OperationalError("no such table: movies_show")
+
+        with self.assertRaises(OperationalError):
+            self.policy.run(broken)
+        self.assertEqual(self.policy.stats.snapshot()['attempts'], 1)
+
+    def test_contention_sqlstates_are_retried(self):
+        """Test that PostgreSQL errors are classified by SQLSTATE."""
+
+        def error(sqlstate):
+            exc = OperationalError("driver error")
+            exc.__cause__ = type('DriverError', (Exception,), {'sqlstate': sqlstate})()
+            return exc
+
+        for code in ('40001', '40P01', '55P03'):
+            self.assertTrue(self.policy.is_transient(error(code)), code)
+        for code in ('57014', '08006'):
+            self.assertFalse(self.policy.is_transient(error(code)), code)
+        self.assertTrue(self.policy.is_timed_out(error('57014'), 0))
+
+    def test_timed_out_attempts_are_not_retried(self):
+        """Test that a lock wait that used up the whole timeout is given up at once."""
+        policy = RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0, busy_timeout=20)
+        exc = OperationalError("database is locked")
+
+        self.assertFalse(policy.is_timed_out(exc, 0.01))
+        self.assertTrue(policy.is_timed_out(exc, 20.0))
+
+        def waited_out():
+            raise exc
+
+        with mock.patch('movies.retry.time.monotonic', side_effect=[0, 20.5]), \
+                self.assertRaises(RetriesExhausted), self.assertLogs('movies.retry', 'WARNING'):
+            policy.run(waited_out)
+        self.assertEqual(policy.stats.snapshot(), {'attempts': 1, 'retries': 0, 'give_ups': 1})
+
+    def test_backoff_is_jittered_and_capped(self):
+        """Test that backoff never exceeds the configured ceiling."""
+        policy = RetryPolicy(backoff_base=0.01, backoff_max=0.02)
+        for attempt in range(1, 10):
+            self.assertLessEqual(policy.backoff(attempt), 0.02)
+
+
 class ShowModelTest(TestCase):
     """Test cases for Show model."""
 
@@ -72,6 +211,76 @@ class ShowModelTest(TestCase):
         self.show.refresh_from_db()
         self.assertEqual(self.show.available_seats, 99)
 
+    def test_seat_map_tracks_booking_status(self):
+        """Test that booking and cancelling keeps the bitmap in sync."""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        booking = Booking.objects.create(user=user, show=self.show, seat_number=7)
+
+        show = Show.objects.get(id=self.show.id)
+        self.assertEqual(show.booked_seat_numbers, [7])
+
+        booking = Booking.objects.get(id=booking.id)
+        booking.status = 'cancelled'
+        booking.save()
+
+        show.refresh_from_db()
+        self.assertEqual(show.booked_seat_numbers, [])
+        self.assertEqual(show.available_seats, 100)
+
+    def test_seat_map_freed_when_bookings_are_deleted(self):
+        """Test that deleting booked rows, directly or by cascade, frees their seats."""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        other = User.objects.create_user(username='otheruser', password='testpass')
+        Booking.objects.create(user=user, show=self.show, seat_number=3)
+        Booking.objects.create(user=other, show=self.show, seat_number=4)
+        Booking.objects.create(user=other, show=self.show, seat_number=5, status='cancelled')
+        booking = Booking.objects.create(user=other, show=self.show, seat_number=5)
+
+        user.delete()
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [4, 5])
+
+        booking.delete()
+        Booking.objects.filter(seat_number=4).delete()
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [])
+
+    def test_deleted_seats_released_once_per_show(self):
+        """Test that a cascade updates each bitmap once and skips deleted shows."""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        other_show = Show.objects.create(
+            movie=self.movie, screen_name="Screen 2",
+            date_time=timezone.now() + timedelta(days=2), total_seats=50, price=100
+        )
+        for seat in range(1, 6):
+            Booking.objects.create(user=user, show=self.show, seat_number=seat)
+            Booking.objects.create(user=user, show=other_show, seat_number=seat)
+        Booking.objects.create(
+            user=User.objects.create_user(username='otheruser', password='testpass'),
+            show=other_show, seat_number=10
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            user.delete()
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "movies_show"')]
+        self.assertEqual(len(updates), 2)
+        other_show.refresh_from_db()
+        self.assertEqual(other_show.booked_seat_numbers, [10])
+
+        with CaptureQueriesContext(connection) as ctx:
+            other_show.delete()
+        self.assertFalse(any(q['sql'].startswith('UPDATE "movies_show"') for q in ctx.captured_queries))
+
+    def test_seat_map_not_overwritten_from_stale_show(self):
+        """Test that saving a booking re-reads the bitmap instead of trusting its show instance."""
+        user = User.objects.create_user(username='testuser', password='testpass')
+        stale_show = Show.objects.get(id=self.show.id)
+        Booking.objects.create(user=user, show=self.show, seat_number=1)
+        Booking.objects.create(user=user, show=stale_show, seat_number=2)
+
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [1, 2])
+
 
 class BookingModelTest(TestCase):
     """Test cases for Booking model."""
@@ -192,6 +401,424 @@ class MovieAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['title'], "Test Movie")
 
+    def test_movie_list_show_counts_use_one_query(self):
+        """Test that show counts are annotated instead of counted per movie."""
+        now = timezone.now()
+        for i in range(5):
+            movie = Movie.objects.create(title=f"Movie {i}", duration_minutes=90)
+            for offset in (-1, 1, 2):
+                Show.objects.create(
+                    movie=movie,
+                    screen_name="Screen 1",
+                    date_time=now + timedelta(days=offset),
+                    total_seats=50,
+                    price=200.00
+                )
+
+        url = reverse('movie-list')
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        counts = {m['title']: (m['shows_count'], m['upcoming_shows_count']) for m in response.data['results']}
+        self.assertEqual(counts["Movie 0"], (3, 2))
+        self.assertEqual(counts["Test Movie"], (0, 0))
+
+
+class MoviePageAPITest(APITestCase):
+    """Test cases for the composite movie page API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.movie = Movie.objects.create(title="Page Movie", duration_minutes=120, genre="Drama")
+        now = timezone.now()
+        for i, offset in enumerate((-1, 1, 2)):
+            Show.objects.create(
+                movie=self.movie, screen_name=f"Screen {i}", date_time=now + timedelta(days=offset),
+                total_seats=50, price=200.00
+            )
+        self.upcoming = Show.objects.get(screen_name="Screen 1")
+        Booking.objects.create(user=self.user, show=self.upcoming, seat_number=7)
+        self.url = reverse('movie-page', kwargs={'pk': self.movie.id})
+
+    def test_movie_page(self):
+        """Test that the movie, its upcoming shows and their availability come in two queries."""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['movie']['title'], "Page Movie")
+        self.assertEqual(response.data['movie']['upcoming_shows_count'], 2)
+        shows = response.data['shows']
+        self.assertEqual([show['screen_name'] for show in shows], ["Screen 1", "Screen 2"])
+        self.assertEqual(shows[0]['available_seats'], 49)
+        self.assertEqual(shows[0]['booked_seat_numbers'], [7])
+
+    @override_settings(CATALOGUE_CACHE_LISTS=True, CATALOGUE_CACHE_SEATS=True)
+    def test_movie_page_cache_overlays_bookings(self):
+        """Test that bookings update the cached page without evicting it."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        Booking.objects.create(user=self.user, show=self.upcoming, seat_number=8)
+
+        # Only the booked show's seat entry is reloaded
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['shows'][0]['available_seats'], 48)
+        self.assertEqual(response.data['shows'][0]['booked_seat_numbers'], [7, 8])
+        self.assertEqual(response.data['shows'][1]['available_seats'], 50)
+
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_movie_page_invalidated_by_movie_and_show_changes(self):
+        """Test that editing the movie or its shows rebuilds the page."""
+        self.client.get(self.url)
+        self.movie.title = "Renamed Movie"
+        self.movie.save()
+        self.assertEqual(self.client.get(self.url).data['movie']['title'], "Renamed Movie")
+
+        self.upcoming.delete()
+        response = self.client.get(self.url)
+        self.assertEqual([show['screen_name'] for show in response.data['shows']], ["Screen 2"])
+
+    def test_movie_page_not_found(self):
+        """Test the movie page of a missing movie."""
+        response = self.client.get(reverse('movie-page', kwargs={'pk': 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MovieSearchAPITest(APITestCase):
+    """Test cases for the full-text movie search API."""
+
+    def setUp(self):
+        self.knight = Movie.objects.create(
+            title="The Dark Knight", duration_minutes=152, genre="Action", rating=9.0,
+            description="Batman faces the Joker.", release_date='2008-07-18'
+        )
+        self.inception = Movie.objects.create(
+            title="Inception", duration_minutes=148, genre="Sci-Fi", rating=8.8,
+            description="A thief steals secrets through dark dreams.", release_date='2010-07-16'
+        )
+        self.comedy = Movie.objects.create(
+            title="Knight and Day", duration_minutes=110, genre="Comedy", rating=6.3,
+            release_date='2010-06-23'
+        )
+        self.url = reverse('movie-search')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [movie['title'] for movie in response.data['results']]
+
+    def test_search_ranks_title_matches_first(self):
+        """Test that every word must match as a prefix and title matches rank first."""
+        self.assertEqual(self.search(q='dark'), ["The Dark Knight", "Inception"])
+        self.assertEqual(self.search(q='dark kni'), ["The Dark Knight"])
+        self.assertEqual(self.search(q='sci'), ["Inception"])
+        self.assertEqual(self.search(q='zombies'), [])
+
+    def test_search_filters(self):
+        """Test the genre, rating range and release date range filters."""
+        self.assertEqual(self.search(q='knight', genre='Comedy'), ["Knight and Day"])
+        self.assertEqual(self.search(rating_min='8.9'), ["The Dark Knight"])
+        self.assertEqual(self.search(rating_max='7', released_from='2010-01-01'), ["Knight and Day"])
+        self.assertEqual(
+            self.search(released_to='2010-12-31'), ["Inception", "Knight and Day", "The Dark Knight"]
+        )
+
+    def test_search_follows_movie_changes(self):
+        """Test that the index follows movie updates and deletes."""
+        self.inception.title = "Interstellar"
+        self.inception.save()
+        self.assertEqual(self.search(q='interstellar'), ["Interstellar"])
+        self.assertEqual(self.search(q='inception'), [])
+
+        self.knight.delete()
+        self.assertEqual(self.search(q='dark'), ["Interstellar"])
+
+    def test_search_input_is_not_query_syntax(self):
+        """Test that full-text operators and quotes in the input are matched literally."""
+        self.assertEqual(self.search(q='"knight" OR NEAR(batman'), [])
+        self.assertEqual(self.search(q='!!!'), ["Inception", "Knight and Day", "The Dark Knight"])
+
+    def test_search_invalid_filters(self):
+        """Test that invalid filters are rejected."""
+        for params in ({'rating_min': 'high'}, {'released_from': '18/07/2008'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+
+
+class ShowAPITest(APITestCase):
+    """Test cases for show listing APIs."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            password='testpass123'
+        )
+        self.movie = Movie.objects.create(
+            title="Test Movie",
+            duration_minutes=120
+        )
+
+    def create_shows(self, count):
+        """Create shows for the test movie, each with one booked seat."""
+        for i in range(count):
+            show = Show.objects.create(
+                movie=self.movie,
+                screen_name=f"Screen {i}",
+                date_time=timezone.now() + timedelta(days=1, hours=i),
+                total_seats=50,
+                price=200.00
+            )
+            Booking.objects.create(user=self.user, show=show, seat_number=1)
+
+    def test_show_list_query_count_is_constant(self):
+        """Test that listing shows does not issue per-show queries."""
+        url = reverse('show-list')
+        self.create_shows(1)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['available_seats'], 49)
+
+        self.create_shows(10)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 11)
+
+    def test_movie_shows_query_count_is_constant(self):
+        """Test that a movie's show list does not issue per-show queries."""
+        url = reverse('movie-shows', kwargs={'movie_id': self.movie.id})
+        self.create_shows(1)
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        self.create_shows(10)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['movie_title'], "Test Movie")
+
+    @override_settings(CATALOGUE_CACHE_LISTS=True, CATALOGUE_CACHE_SEATS=True)
+    def test_show_list_is_cached_with_live_availability(self):
+        """Test that cached listings still reflect new bookings."""
+        self.create_shows(3)
+        url = reverse('show-list')
+        self.client.get(url)
+
+        # Shell from the cache, availability loaded once, then all from memory
+        with self.assertNumQueries(1):
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['available_seats'], 49)
+
+        show = Show.objects.order_by('date_time').first()
+        Booking.objects.create(user=self.user, show=show, seat_number=2)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['available_seats'], 48)
+        self.assertEqual(response.data['results'][0]['booked_seat_numbers'], [1, 2])
+        self.assertEqual(response.data['results'][1]['available_seats'], 49)
+
+    @override_settings(CATALOGUE_CACHE_LISTS=True)
+    def test_show_changes_invalidate_cached_listing(self):
+        """Test that creating a show invalidates the cached listings."""
+        self.create_shows(1)
+        url = reverse('movie-shows', kwargs={'movie_id': self.movie.id})
+        self.assertEqual(len(self.client.get(url).data['results']), 1)
+
+        self.create_shows(1)
+        self.assertEqual(len(self.client.get(url).data['results']), 2)
+
+    @override_settings(CATALOGUE_CACHE_LISTS=True)
+    def test_cache_key_ignores_unknown_parameters(self):
+        """Test that only parameters the view reads select a cached listing."""
+        self.create_shows(1)
+        url = reverse('show-list')
+        self.client.get(url, {'page_size': 5})
+
+        # Cached shell: only the availability overlay is queried
+        with self.assertNumQueries(1):
+            self.client.get(url, {'page_size': 5, 'utm_source': 'mail'})
+        with self.assertNumQueries(2):
+            self.client.get(url, {'page_size': 6})
+
+    @override_settings(CATALOGUE_CACHE_LISTS=False)
+    def test_lists_not_cached_in_process_local_cache(self):
+        """Test that listings are rebuilt on every request without a shared cache."""
+        self.create_shows(1)
+        url = reverse('show-list')
+        self.client.get(url)
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+    def test_show_list_cursor_pagination(self):
+        """Test keyset pagination walks all shows without a COUNT query."""
+        self.create_shows(25)
+        url = reverse('show-list')
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'pagination': 'cursor'})
+        self.assertFalse(any('COUNT' in q['sql'] for q in ctx.captured_queries))
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 20)
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(response.data['results'][-1]['screen_name'], "Screen 24")
+
+
+class ShowCalendarAPITest(APITestCase):
+    """Test cases for the showtime calendar API."""
+
+    def setUp(self):
+        self.movie = Movie.objects.create(title="Morning Movie", duration_minutes=120)
+        self.other_movie = Movie.objects.create(title="Evening Movie", duration_minutes=100)
+        day = timezone.make_aware(datetime(2030, 1, 7))
+        for movie, screen, offset in (
+            (self.movie, "Screen 1", timedelta(hours=10)),
+            (self.other_movie, "Screen 2", timedelta(hours=19)),
+            (self.movie, "Screen 1", timedelta(hours=21)),
+            (self.other_movie, "Screen 1", timedelta(days=2, hours=19)),
+            (self.movie, "Screen 1", timedelta(days=10, hours=19)),
+        ):
+            Show.objects.create(
+                movie=movie, screen_name=screen, date_time=day + offset, total_seats=50, price=200.00
+            )
+        self.url = reverse('show-calendar')
+
+    def test_calendar_groups_shows_by_day(self):
+        """Test per-day counts for the window and the shows of the first day."""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'start': '2030-01-07', 'end': '2030-01-09'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(str(day['date']), day['count']) for day in response.data['days']],
+            [('2030-01-07', 3), ('2030-01-09', 1)]
+        )
+        self.assertEqual(str(response.data['day']), '2030-01-07')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [show['screen_name'] for show in response.data['results']], ["Screen 1", "Screen 2", "Screen 1"]
+        )
+        self.assertEqual(response.data['results'][0]['available_seats'], 50)
+
+    def test_calendar_day_and_filters(self):
+        """Test selecting a day and filtering by screen and movie."""
+        params = {'start': '2030-01-07', 'end': '2030-01-13'}
+        response = self.client.get(self.url, {**params, 'day': '2030-01-09'})
+        self.assertEqual([show['movie_title'] for show in response.data['results']], ["Evening Movie"])
+
+        response = self.client.get(self.url, {**params, 'screen': 'Screen 1', 'movie': self.movie.id})
+        self.assertEqual([day['count'] for day in response.data['days']], [2])
+        self.assertEqual(response.data['count'], 2)
+
+    def test_calendar_day_is_paginated(self):
+        """Test that a day's shows are paginated."""
+        response = self.client.get(self.url, {'start': '2030-01-07', 'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_calendar_datetime_window(self):
+        """Test a window bounded by datetimes within one evening."""
+        response = self.client.get(
+            self.url, {'start': '2030-01-07T18:00:00Z', 'end': '2030-01-07T20:00:00Z'}
+        )
+        self.assertEqual([day['count'] for day in response.data['days']], [1])
+        self.assertEqual([show['screen_name'] for show in response.data['results']], ["Screen 2"])
+
+    def test_calendar_defaults_to_the_coming_week(self):
+        """Test that the default window starts today."""
+        Show.objects.create(
+            movie=self.movie, screen_name="Screen 3", date_time=timezone.now() + timedelta(days=1),
+            total_seats=50, price=200.00
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([show['screen_name'] for show in response.data['results']], ["Screen 3"])
+
+    def test_calendar_invalid_window(self):
+        """Test that invalid windows and filters are rejected."""
+        for params in (
+            {'start': '2030-01-09', 'end': '2030-01-07'},
+            {'start': '2030-01-01', 'end': '2030-03-01'},
+            {'start': 'tomorrow'},
+            {'movie': 'abc'},
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+
+
+class ShowAvailabilityAPITest(APITestCase):
+    """Test cases for the batch show availability API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        movie = Movie.objects.create(title="Test Movie", duration_minutes=120)
+        show_time = timezone.now() + timedelta(days=1)
+        self.show = Show.objects.create(
+            movie=movie, screen_name="Screen 1", date_time=show_time, total_seats=50, price=200.00
+        )
+        self.small_show = Show.objects.create(
+            movie=movie, screen_name="Screen 2", date_time=show_time, total_seats=1, price=200.00
+        )
+        Booking.objects.create(user=self.user, show=self.show, seat_number=1)
+        Booking.objects.create(user=self.user, show=self.small_show, seat_number=1)
+        self.url = reverse('show-availability')
+        self.ids = f'{self.show.id},{self.small_show.id},999999'
+
+    @override_settings(CATALOGUE_CACHE_SEATS=True)
+    def test_availability(self):
+        """Test availability of several shows, loaded together and then served from the cache."""
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {'ids': self.ids})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            str(self.show.id): {'available': 49, 'total': 50, 'sold_out': False},
+            str(self.small_show.id): {'available': 0, 'total': 1, 'sold_out': True},
+        })
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'ids': f'{self.small_show.id},{self.show.id}'})
+        self.assertEqual(list(response.data), [str(self.small_show.id), str(self.show.id)])
+
+    @override_settings(CATALOGUE_CACHE_SEATS=False)
+    def test_availability_not_cached_in_process_local_cache(self):
+        """Test that seat entries are not cached unless the cache is shared by all workers."""
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                response = self.client.get(self.url, {'ids': self.ids})
+        self.assertEqual(response.data[str(self.show.id)]['available'], 49)
+        self.assertIsNone(cache.get(f'show-seats:{self.show.id}'))
+
+    def test_availability_etag(self):
+        """Test that an unchanged ETag gets a 304 until a booking changes availability."""
+        response = self.client.get(self.url, {'ids': self.ids})
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(self.url, {'ids': self.ids}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        Booking.objects.create(user=self.user, show=self.show, seat_number=2)
+        response = self.client.get(self.url, {'ids': self.ids}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[str(self.show.id)]['available'], 48)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @override_settings(SHOW_AVAILABILITY_MAX_IDS=2)
+    def test_availability_invalid_ids(self):
+        """Test that missing, malformed and too many ids are rejected."""
+        for ids in ('', 'a,b', '1,2,3'):
+            response = self.client.get(self.url, {'ids': ids})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+
 
 class BookingAPITest(APITestCase):
     """Test cases for booking APIs."""
@@ -234,6 +861,50 @@ class BookingAPITest(APITestCase):
             seat_number=1
         ).exists())
 
+    def test_book_seat_query_count(self):
+        """Test that booking loads the show once and writes once per table."""
+        self.authenticate()
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {'seat_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['movie_title'], "Test Movie")
+
+        statements = [query['sql'].split()[0] for query in ctx.captured_queries]
+        # User lookup for JWT auth, then show+movie SELECT, INSERT and UPDATE
+        self.assertEqual(statements.count('SELECT'), 2)
+        self.assertEqual(statements.count('INSERT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 1)
+
+    @override_settings(BOOKING_STRATEGY='optimistic')
+    def test_book_seat_optimistic_strategy(self):
+        """Test that the lock-free strategy books seats and reports conflicts."""
+        self.authenticate()
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [1])
+
+        # A row the bitmap does not know about yet, as if another request
+        # committed it after this one read the show
+        Booking.objects.bulk_create([
+            Booking(user=self.user, show=self.show, seat_number=2, status='booked')
+        ])
+        response = self.client.post(url, {'seat_number': 2})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Seat already booked')
+
+    def test_book_seat_busy_returns_retry_after(self):
+        """Test that persistent lock errors end in 503 with Retry-After."""
+        self.authenticate()
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        with mock.patch('movies.booking.load_show', side_effect=OperationalError("database is locked")), \
+                self.assertLogs('movies.retry', 'WARNING'):
+            response = self.client.post(url, {'seat_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
     def test_book_already_booked_seat(self):
         """Test booking an already booked seat."""
         # Book seat first
@@ -289,8 +960,51 @@ class BookingAPITest(APITestCase):
         
         self.authenticate()
         url = reverse('cancel-booking', kwargs={'booking_id': booking.id})
-        response = self.client.post(url)
+        # Refused on a plain read: no transaction and no lock on the show
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse([query for query in queries if 'movies_show' in query['sql']])
+
+    def test_user_bookings_cursor_pagination(self):
+        """Test keyset pagination of a user's bookings, newest first."""
+        for seat in range(1, 4):
+            Booking.objects.create(user=self.user, show=self.show, seat_number=seat)
+
+        self.authenticate()
+        response = self.client.get(reverse('user-bookings'), {'pagination': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([b['seat_number'] for b in response.data['results']], [3, 2, 1])
+
+    def test_rebook_cancelled_seat(self):
+        """Test that a cancelled seat can be sold again."""
+        booking = Booking.objects.create(
+            user=self.user,
+            show=self.show,
+            seat_number=1,
+            status='booked'
+        )
+        self.authenticate()
+        self.client.post(reverse('cancel-booking', kwargs={'booking_id': booking.id}))
+
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Booking.objects.filter(show=self.show, seat_number=1).count(), 2)
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [1])
+
+        # Cancelling the old booking again must not free the new owner's seat
+        response = self.client.post(reverse('cancel-booking', kwargs={'booking_id': booking.id}))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.show.refresh_from_db()
+        self.assertEqual(self.show.booked_seat_numbers, [1])
+
+    def test_cancel_missing_booking(self):
+        """Test cancelling a booking that does not exist."""
+        self.authenticate()
+        response = self.client.post(reverse('cancel-booking', kwargs={'booking_id': 999999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_user_bookings_list(self):
         """Test user bookings list API."""
@@ -305,4 +1019,946 @@ class BookingAPITest(APITestCase):
         url = reverse('user-bookings')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_book_seats_batch_success(self):
+        """Test booking several seats in one request."""
+        self.authenticate()
+        url = reverse('book-seats-batch', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_numbers': [3, 1, 2]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['seat_numbers'], [1, 2, 3])
+        self.assertEqual(len(response.data['booking_ids']), 3)
+        self.assertEqual(
+            Booking.objects.filter(user=self.user, show=self.show, status='booked').count(),
+            3
+        )
+
+    def test_book_seats_batch_is_all_or_nothing(self):
+        """Test that a batch containing a booked seat books nothing."""
+        Booking.objects.create(
+            user=self.user,
+            show=self.show,
+            seat_number=2,
+            status='booked'
+        )
+
+        self.authenticate()
+        url = reverse('book-seats-batch', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_numbers': [1, 2, 3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['unavailable_seats'], [2])
+        self.assertEqual(Booking.objects.filter(show=self.show).count(), 1)
+
+    def test_book_seats_batch_validation(self):
+        """Test that duplicate and out-of-range seats are rejected."""
+        self.authenticate()
+        url = reverse('book-seats-batch', kwargs={'show_id': self.show.id})
+
+        response = self.client.post(url, {'seat_numbers': [1, 1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url, {'seat_numbers': [1, 101]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Booking.objects.filter(show=self.show).exists())
+
+    def test_show_seat_formats(self):
+        """Test that show listings can return the encoded bitmap."""
+        Booking.objects.create(user=self.user, show=self.show, seat_number=3)
+        url = reverse('show-list')
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['results'][0]['booked_seat_numbers'], [3])
+        self.assertNotIn('seat_map', response.data['results'][0])
+
+        response = self.client.get(url, {'seat_format': 'rle'})
+        self.assertEqual(response.data['results'][0]['seat_map'], [2, 1, 97])
+        self.assertNotIn('booked_seat_numbers', response.data['results'][0])
+
+        response = self.client.get(url, {'seat_format': 'base64'})
+        self.assertEqual(len(response.data['results'][0]['seat_map']), 20)
+
+
+class QueryRegressionTest(APITestCase):
+    """
+    Query counts and plans of the read endpoints at result sizes 1, 20 and 100.
+
+    Set QUERY_PROFILE_REPORT to a file path to save every profile as JSON.
+    """
+    PAGE_SIZES = (1, 20, 100)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass123')
+        cls.movie = Movie.objects.create(title="Main Movie", duration_minutes=120)
+        other_movies = Movie.objects.bulk_create(
+            Movie(title=f"Movie {number}", duration_minutes=90) for number in range(100)
+        )
+        start = timezone.now() + timedelta(days=1)
+        shows = Show.objects.bulk_create(
+            Show(
+                movie=movie,
+                screen_name="Screen 1",
+                date_time=start + timedelta(hours=number),
+                total_seats=100,
+                price=250.00
+            )
+            for number, movie in enumerate([cls.movie] * 100 + other_movies)
+        )
+        for show in shows[:100]:
+            Booking.objects.create(user=cls.user, show=show, seat_number=1)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.profiles = []
+
+    @classmethod
+    def tearDownClass(cls):
+        path = os.environ.get('QUERY_PROFILE_REPORT')
+        if path:
+            write_report(cls.profiles, path)
+        super().tearDownClass()
+
+    def setUp(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def profile(self, url):
+        # Measure the uncached path
+        cache.clear()
+        profile = profile_request(self.client, url)
+        self.profiles.append(profile)
+        self.assertEqual(profile.response.status_code, status.HTTP_200_OK, url)
+        return profile
+
+    def assert_constant_queries(self, url, index_name=None):
+        """Check the query count is the same at every page size, and the index used."""
+        profiles = {}
+        for page_size in self.PAGE_SIZES:
+            separator = '&' if '?' in url else '?'
+            profile = self.profile(f'{url}{separator}page_size={page_size}')
+            results = json.loads(profile.response.content)['results']
+            self.assertEqual(len(results), page_size, profile.url)
+            profiles[page_size] = profile
+        self.assert_same_queries(url, profiles, index_name)
+
+    def assert_same_queries(self, url, profiles, index_name=None):
+        """Check the profiles, keyed by result size, ran as many queries and used ``index_name``."""
+        counts = {size: profile.query_count for size, profile in profiles.items()}
+        if index_name:
+            for profile in profiles.values():
+                self.assertTrue(
+                    profile.uses_index(index_name),
+                    f"{profile.url} no longer uses {index_name}:\n" + '\n'.join(profile.plans.values())
+                )
+        self.assertEqual(len(set(counts.values())), 1, f"{url} query count grows with result size: {counts}")
+
+    def test_movie_list(self):
+        # Show counts are aggregated through the shows' movie index
+        self.assert_constant_queries(reverse('movie-list'), 'show_movie_datetime_idx')
+        self.assert_constant_queries(reverse('async-movie-list'))
+
+    def test_movie_search(self):
+        index_name = search.FTS_TABLE if connection.vendor == 'sqlite' else search.GIN_INDEX
+        self.assert_constant_queries(reverse('movie-search') + '?q=movie', index_name)
+
+    def test_movie_page(self):
+        url = reverse('movie-page', kwargs={'pk': self.movie.id})
+        profiles = {}
+        for size in self.PAGE_SIZES:
+            with self.settings(MOVIE_PAGE_MAX_SHOWS=size):
+                profile = self.profile(url)
+            self.assertEqual(len(json.loads(profile.response.content)['shows']), size)
+            profiles[size] = profile
+        self.assert_same_queries(url, profiles, 'show_movie_datetime_idx')
+
+    def test_movie_shows(self):
+        url = reverse('movie-shows', kwargs={'movie_id': self.movie.id})
+        self.assert_constant_queries(url, 'show_movie_datetime_idx')
+        self.assert_constant_queries(url + '?pagination=cursor', 'show_movie_datetime_idx')
+        async_url = reverse('async-movie-shows', kwargs={'movie_id': self.movie.id})
+        self.assert_constant_queries(async_url, 'show_movie_datetime_idx')
+
+    def test_show_list(self):
+        self.assert_constant_queries(reverse('show-list'), 'show_datetime_id_idx')
+        self.assert_constant_queries(reverse('show-list') + '?pagination=cursor', 'show_datetime_id_idx')
+        self.assert_constant_queries(reverse('async-show-list'), 'show_datetime_id_idx')
+
+    def test_show_calendar(self):
+        # The shared shows are hourly, so one day holds too few for a full page
+        day = timezone.localdate() + timedelta(days=20)
+        day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+        Show.objects.bulk_create(
+            Show(
+                movie=self.movie,
+                screen_name="Screen 2",
+                date_time=day_start + timedelta(minutes=10 * number),
+                total_seats=100,
+                price=250.00
+            )
+            for number in range(100)
+        )
+        url = reverse('show-calendar') + f'?start={day}&end={day}&screen=Screen%202'
+        self.assert_constant_queries(url, 'show_screen_datetime_idx')
+
+    def test_show_availability(self):
+        show_ids = list(Show.objects.order_by('id').values_list('id', flat=True))
+        # SQLite plans a rowid lookup; PostgreSQL names the primary key index
+        index_name = 'INTEGER PRIMARY KEY' if connection.vendor == 'sqlite' else 'movies_show_pkey'
+        url = reverse('show-availability')
+        profiles = {}
+        for size in self.PAGE_SIZES:
+            profile = self.profile(url + '?ids=' + ','.join(map(str, show_ids[:size])))
+            self.assertEqual(len(json.loads(profile.response.content)), size)
+            profiles[size] = profile
+        self.assert_same_queries(url, profiles, index_name)
+
+    def test_user_bookings(self):
+        url = reverse('user-bookings')
+        self.assert_constant_queries(url, 'booking_user_created_idx')
+        self.assert_constant_queries(url + '?pagination=cursor', 'booking_user_created_idx')
+
+    def test_user_profile(self):
+        """Test that the profile's booking count does not load the bookings."""
+        url = reverse('user-profile')
+        other_user = User.objects.create_user(username='otheruser', password='testpass123')
+        profiles = {100: self.profile(url)}
+        token = RefreshToken.for_user(other_user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        profiles[0] = self.profile(url)
+        self.assertEqual(json.loads(profiles[100].response.content)['bookings_count'], 100)
+        self.assertEqual(json.loads(profiles[0].response.content)['bookings_count'], 0)
+        self.assert_same_queries(url, profiles)
+
+    def test_detail_endpoints(self):
+        """Test that detail endpoints run a fixed number of queries."""
+        # Sync endpoints spend one query authenticating the user
+        self.assertEqual(self.profile(reverse('movie-detail', kwargs={'pk': self.movie.id})).query_count, 2)
+        self.assertEqual(self.profile(reverse('async-movie-detail', kwargs={'pk': self.movie.id})).query_count, 1)
+        self.assertEqual(self.profile(reverse('user-profile')).query_count, 2)
+
+
+class RequestTimingTest(APITestCase):
+    """Test cases for the request timing middleware."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.show = Show.objects.create(
+            movie=Movie.objects.create(title="Test Movie", duration_minutes=120),
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=100,
+            price=250.00
+        )
+
+    def test_server_timing_header(self):
+        """Test that responses break down their time in Server-Timing."""
+        response = self.client.get(reverse('movie-list'))
+        server_timing = response['Server-Timing']
+        self.assertIn('total;dur=', server_timing)
+        self.assertRegex(server_timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        self.assertIn('render;dur=', server_timing)
+
+        response = self.client.get(reverse('async-movie-list'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+    def test_server_timing_reports_serialization(self):
+        """Test that uncached lists and bookings report their serialization time."""
+        cache.clear()
+        response = self.client.get(reverse('show-list'))
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+        response = self.client.get(reverse('movie-page', kwargs={'pk': self.show.movie_id}))
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('user-bookings'))
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+    def test_booking_reports_lock_wait(self):
+        """Test that booking reports the time spent waiting for the show lock."""
+        self.client.force_authenticate(user=self.user)
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_number': 5})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn('lock;dur=', response['Server-Timing'])
+
+    @override_settings(REQUEST_TIMING={'SLOW_REQUEST_MS': 0})
+    def test_slow_request_logs_sql(self):
+        """Test that slow requests are logged as JSON with their SQL."""
+        with self.assertLogs('movies.timing', 'WARNING') as logs:
+            self.client.get(reverse('movie-list'))
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['view'], 'movie-list')
+        self.assertEqual(entry['status'], 200)
+        self.assertTrue(entry['slow'])
+        self.assertEqual(len(entry['sql']), entry['queries'])
+        self.assertIn('SELECT', entry['sql'][0]['sql'])
+
+    @override_settings(REQUEST_TIMING={'SAMPLE_RATE': 1.0, 'SLOW_REQUEST_MS': 60000})
+    def test_sampled_request_log(self):
+        """Test that sampled requests are logged without their SQL."""
+        with self.assertLogs('movies.timing', 'INFO') as logs:
+            self.client.get(reverse('show-list'))
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertIn('db_ms', entry)
+        self.assertNotIn('sql', entry)
+
+
+class MetricsTest(APITestCase):
+    """Test cases for the Prometheus metrics."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.show = Show.objects.create(
+            movie=Movie.objects.create(title="Test Movie", duration_minutes=120),
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=100,
+            price=250.00
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_metrics_endpoint(self):
+        """Test that metrics are served in the Prometheus text format."""
+        self.client.get(reverse('movie-list'))
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertIn(
+            b'http_request_duration_seconds_count{method="GET",status="200",view="movie-list"}',
+            response.content
+        )
+
+    def test_booking_counters(self):
+        """Test that bookings, cancellations, conflicts and lock waits are counted."""
+        booked = self.sample('booking_seats_booked_total')
+        cancelled = self.sample('booking_seats_cancelled_total')
+        conflicts = self.sample('booking_seat_conflicts_total', check='seat_map')
+        lock_waits = self.sample('booking_lock_wait_seconds_count')
+        attempts = self.sample('booking_retry_events_total', event='attempts')
+        url = reverse('book-seats-batch', kwargs={'show_id': self.show.id})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'seat_numbers': [1, 2]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post(url, {'seat_numbers': [2, 3]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        booking = Booking.objects.get(show=self.show, seat_number=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('cancel-booking', kwargs={'booking_id': booking.id}))
+
+        self.assertEqual(self.sample('booking_seats_booked_total'), booked + 2)
+        self.assertEqual(self.sample('booking_seats_cancelled_total'), cancelled + 1)
+        self.assertEqual(self.sample('booking_seat_conflicts_total', check='seat_map'), conflicts + 1)
+        self.assertEqual(self.sample('booking_lock_wait_seconds_count'), lock_waits + 2)
+        self.assertEqual(self.sample('booking_retry_events_total', event='attempts'), attempts + 2)
+
+    @override_settings(CATALOGUE_CACHE_LISTS=True)
+    def test_cache_hits_and_misses(self):
+        """Test that catalogue cache lookups are counted by result."""
+        hits = self.sample('catalogue_cache_requests_total', cache='list', result='hit')
+        misses = self.sample('catalogue_cache_requests_total', cache='list', result='miss')
+        self.client.get(reverse('show-list'))
+        self.client.get(reverse('show-list'))
+        self.assertEqual(self.sample('catalogue_cache_requests_total', cache='list', result='miss'), misses + 1)
+        self.assertEqual(self.sample('catalogue_cache_requests_total', cache='list', result='hit'), hits + 1)
+
+    def test_metrics_restricted(self):
+        """Test that metrics are only served to staff and allowed networks."""
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.settings(METRICS_ALLOWED_NETWORKS=['203.0.113.0/24']):
+            response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get('/metrics', REMOTE_ADDR='203.0.113.5')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_connection_gauges(self):
+        """Test that a request's connections are counted as open and in use until it ends."""
+        open_before = self.sample('db_connections_open', alias='default')
+        in_use_before = self.sample('db_connections_in_use', alias='default')
+        during = {}
+
+        def serve():
+            request_started.send(sender=self.__class__)
+            connections[DEFAULT_DB_ALIAS].ensure_connection()
+            during['open'] = self.sample('db_connections_open', alias='default')
+            during['in_use'] = self.sample('db_connections_in_use', alias='default')
+            # Django's receiver closes it first (CONN_MAX_AGE is 0), but the
+            # test client reconnects that receiver after the metrics one
+            close_old_connections()
+            request_finished.send(sender=self.__class__)
+
+        thread = threading.Thread(target=serve)
+        # Let the thread's connection to the in-memory test database close
+        with mock.patch.object(SQLiteDatabaseWrapper, 'is_in_memory_db', return_value=False):
+            thread.start()
+            thread.join()
+
+        self.assertEqual(during, {'open': open_before + 1, 'in_use': in_use_before + 1})
+        self.assertEqual(self.sample('db_connections_open', alias='default'), open_before)
+        self.assertEqual(self.sample('db_connections_in_use', alias='default'), in_use_before)
+
+    def test_pool_stats(self):
+        """Test that psycopg pool statistics are exported when pooling is on."""
+        pool = mock.Mock(**{'get_stats.return_value': {'pool_size': 4, 'pool_available': 3}})
+        with mock.patch('movies.metrics.connections', {alias: mock.Mock(pool=pool) for alias in settings.DATABASES}):
+            update_pool_gauges()
+        self.assertEqual(self.sample('db_pool_stats', alias='default', stat='pool_size'), 4)
+        self.assertEqual(self.sample('db_pool_stats', alias='default', stat='pool_available'), 3)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(APITransactionTestCase):
+    """Test cases for the read-replica database router."""
+    # Not wrapped in a transaction: reads inside one always use the primary
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.show = Show.objects.create(
+            movie=Movie.objects.create(title="Test Movie", duration_minutes=120),
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=100,
+            price=250.00
+        )
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(RefreshToken.for_user(self.user).access_token)
+        )
+
+    def test_reads_use_chosen_replica(self):
+        """Test that reads go to the request's replica and writes to the primary."""
+        self.assertEqual(self.router.db_for_read(Movie), 'default')
+        token = _read_alias.set('replica')
+        try:
+            self.assertEqual(self.router.db_for_read(Movie), 'replica')
+            self.assertEqual(self.router.db_for_write(Movie), 'default')
+        finally:
+            _read_alias.reset(token)
+
+    def test_transactions_stay_on_primary(self):
+        """Test that reads inside a transaction on the primary are not routed away."""
+        token = _read_alias.set('replica')
+        try:
+            with transaction.atomic():
+                self.assertEqual(self.router.db_for_read(Show), 'default')
+        finally:
+            _read_alias.reset(token)
+
+    def test_no_migrations_on_replicas(self):
+        """Test that migrations only run on the primary."""
+        self.assertTrue(self.router.allow_migrate('default', 'movies'))
+        self.assertFalse(self.router.allow_migrate('replica', 'movies'))
+
+    def test_booking_sticks_user_to_primary(self):
+        """Test that a user reads their own booking right after making it."""
+        self.assertFalse(is_stuck_to_primary(self.user))
+        url = reverse('book-seat', kwargs={'show_id': self.show.id})
+        response = self.client.post(url, {'seat_number': 5})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_stuck_to_primary(self.user))
+
+        # Served by the primary: the 'replica' alias is not a real database
+        response = self.client.get(reverse('user-bookings'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['seat_number'], 5)
+
+
+@skipUnless('local_replica' in settings.DATABASES, "No second local database configured")
+class ReplicaDatabaseTest(APITransactionTestCase):
+    """Test cases for replica reads against a second, real database."""
+    # The 'local_replica' database is separate and nothing copies data to it,
+    # so each response shows which database answered it.
+    databases = {'default', 'local_replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.credentials(
+            HTTP_AUTHORIZATION='Bearer ' + str(RefreshToken.for_user(self.user).access_token)
+        )
+
+    def create_show(self, using):
+        return Show.objects.using(using).create(
+            movie=Movie.objects.using(using).create(title=f"{using} movie", duration_minutes=120),
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=100,
+            price=250.00
+        )
+
+    @override_settings(DATABASE_REPLICAS=['local_replica'])
+    def test_catalogue_reads_and_misses_use_replica(self):
+        """Test that catalogue views, cache misses included, read the replica."""
+        self.create_show('default')
+        self.create_show('local_replica')
+
+        for url in (reverse('movie-list'), reverse('show-list')):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['movie_title'], 'local_replica movie')
+
+    @override_settings(DATABASE_REPLICAS=['local_replica'], CATALOGUE_CACHE_LISTS=True, REPLICA_CACHE_TIMEOUT=0)
+    def test_replica_cache_entries_are_short_lived(self):
+        """Test that shells from a replica expire quickly and seat entries are not cached."""
+        show = self.create_show('local_replica')
+        self.client.get(reverse('movie-list'))
+        # A replica catching up sends no invalidation signal
+        Movie.objects.using('local_replica').update(title='Renamed')
+
+        with override_settings(CATALOGUE_CACHE_SEATS=True):
+            response = self.client.get(reverse('movie-list'))
+            self.assertEqual(response.data['results'][0]['title'], 'Renamed')
+            self.client.get(reverse('show-list'))
+            self.assertIsNone(cache.get(seats_key(show.id)))
+
+    @override_settings(DATABASE_REPLICAS=['local_replica'])
+    def test_own_bookings_read_from_primary_after_booking(self):
+        """Test that a user sees their booking right after making it."""
+        show = self.create_show('default')
+        response = self.client.get(reverse('user-bookings'))
+        self.assertEqual(len(response.data['results']), 0)
+
+        response = self.client.post(reverse('book-seat', kwargs={'show_id': show.id}), {'seat_number': 1})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.get(reverse('user-bookings'))
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class BookingBenchmarkTest(TransactionTestCase):
+    """Test cases for the booking load-test harness."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_contended_run_never_double_books(self):
+        """Test that concurrent clients on one show book each seat at most once."""
+        report = run_benchmark(clients=4, requests_per_client=5, seats=10, seed=1)
+
+        self.assertEqual(report['requests'], 20)
+        self.assertTrue(report['invariants']['ok'])
+        self.assertEqual(report['statuses'].get('201'), report['invariants']['booked_seats'])
+        self.assertIn('p99', report['latency_ms'])
+        self.assertFalse(Movie.objects.exists())
+
+
+class GenerateDataTest(TestCase):
+    """Test cases for the synthetic data generator."""
+
+    def test_generate(self):
+        """Test that generated shows, bookings and seat bitmaps are consistent."""
+        totals = generate(movies=5, shows=40, bookings=400, users=10, seed=1, shows_per_task=15)
+
+        self.assertEqual(totals['shows'], 40)
+        self.assertEqual(Show.objects.count(), 40)
+        self.assertEqual(Booking.objects.count(), totals['bookings'])
+        self.assertTrue(Booking.objects.filter(status='cancelled').exists())
+        for show in Show.objects.all():
+            booked = Booking.objects.filter(show=show, status='booked').values_list('seat_number', flat=True)
+            self.assertEqual(seatmap.booked_seats(show.seat_map), sorted(booked))
+
+        # The hottest (newest) movie gets the most shows
+        counts = Movie.objects.with_show_counts().order_by('-release_date', 'id')
+        self.assertEqual(counts[0].shows_count, max(movie.shows_count for movie in counts))
+
+    def test_seed_is_reproducible(self):
+        """Test that the same seed generates the same bookings."""
+        def bookings(seed):
+            generate(movies=3, shows=10, bookings=100, users=5, seed=seed)
+            rows = list(Booking.objects.order_by('id').values_list('seat_number', 'status'))
+            Movie.objects.all().delete()
+            return rows
+
+        self.assertEqual(bookings(7), bookings(7))
+        self.assertNotEqual(bookings(7), bookings(8))
+
+    def test_create_users_returns_this_runs_users(self):
+        """Test that users left by a larger earlier run are not reused."""
+        create_users(5, 'seed7', batch_size=100)
+        user_ids = create_users(3, 'seed7', batch_size=100)
+        self.assertEqual(
+            user_ids,
+            list(User.objects.filter(username__in=[f'seed7-user-{n}' for n in range(3)])
+                 .order_by('id').values_list('id', flat=True))
+        )
+
+
+class BookingExportTest(APITestCase):
+    """Test cases for the streaming booking export."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='finance', password='pass123', is_staff=True)
+        self.user = User.objects.create_user(username='moviefan', email='fan@movies.com', password='pass123')
+        self.movie = Movie.objects.create(
+            title='Export Movie', duration_minutes=120, genre='Drama', rating=7.5, release_date='2024-01-01'
+        )
+        other_movie = Movie.objects.create(
+            title='Other Movie', duration_minutes=90, genre='Comedy', rating=6.0, release_date='2024-01-01'
+        )
+        show_time = timezone.now() + timedelta(days=1)
+        self.show = Show.objects.create(
+            movie=self.movie, screen_name='Screen 1', date_time=show_time, total_seats=50, price=200.00
+        )
+        other_show = Show.objects.create(
+            movie=other_movie, screen_name='Screen 2', date_time=show_time, total_seats=50, price=150.00
+        )
+        Booking.objects.create(user=self.user, show=self.show, seat_number=1)
+        Booking.objects.create(user=self.user, show=self.show, seat_number=2, status='cancelled')
+        Booking.objects.create(user=self.user, show=other_show, seat_number=3)
+        self.url = reverse('export-bookings')
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_export_requires_staff(self):
+        """Test that non-staff users cannot export bookings."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_csv(self):
+        """Test that the CSV export streams every booking with its joined fields."""
+        self.authenticate(self.staff)
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('bookings.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['username'], 'moviefan')
+        self.assertEqual(rows[0]['movie_title'], 'Export Movie')
+        self.assertEqual(rows[0]['screen'], 'Screen 1')
+        self.assertEqual(rows[0]['seat_number'], '1')
+
+    def test_export_csv_formulas(self):
+        """Test that text cells a spreadsheet would run as formulas are escaped."""
+        self.user.username = '=HYPERLINK("http://example.com")'
+        self.user.email = '@evil@movies.com'
+        self.user.save()
+        self.movie.title = '-1+1'
+        self.movie.save()
+        self.authenticate(self.staff)
+        response = self.client.get(self.url, {'movie': self.movie.id, 'status': 'booked'})
+
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0]['username'], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(rows[0]['email'], "'@evil@movies.com")
+        self.assertEqual(rows[0]['movie_title'], "'-1+1")
+        self.assertEqual(rows[0]['price'], '200.00')
+
+    def test_export_ndjson_filters(self):
+        """Test NDJSON output filtered by movie and status in a single query."""
+        self.authenticate(self.staff)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'output': 'ndjson', 'movie': self.movie.id, 'status': 'booked'})
+            content = b''.join(response.streaming_content).decode()
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['show_id'], self.show.id)
+        self.assertEqual(rows[0]['status'], 'booked')
+        # One query for the JWT user, one for the export
+        self.assertEqual(len(queries), 2)
+
+    def test_export_date_range(self):
+        """Test that the date range is inclusive of whole booking days."""
+        self.authenticate(self.staff)
+        today = timezone.localdate().isoformat()
+        tomorrow = (timezone.localdate() + timedelta(days=1)).isoformat()
+
+        response = self.client.get(self.url, {'output': 'ndjson', 'date_from': today, 'date_to': today})
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+        response = self.client.get(self.url, {'output': 'ndjson', 'date_from': tomorrow})
+        self.assertEqual(b''.join(response.streaming_content), b'')
+
+    def test_export_invalid_filters(self):
+        """Test that invalid formats and filters are rejected."""
+        self.authenticate(self.staff)
+        for params in ({'output': 'xml'}, {'date_from': '17/10/2026'}, {'show': 'abc'}, {'status': 'pending'}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('error', response.data)
+
+    async def test_export_asgi(self):
+        """Test that ASGI requests stream rows from an async iterator."""
+        token = RefreshToken.for_user(self.staff).access_token
+        response = await self.async_client.get(
+            self.url, {'output': 'ndjson'}, headers={'Authorization': f'Bearer {token}'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.splitlines()), 3)
+
+    def test_export_command(self):
+        """Test that the management command writes the filtered export to a file."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bookings.csv')
+            call_command('export_bookings', '--show', str(self.show.id), '--output', path)
+            with open(path, newline='') as output:
+                rows = list(csv.DictReader(output))
+
+        self.assertEqual([row['seat_number'] for row in rows], ['1', '2'])
+
+
+class SeatEventsTest(TestCase):
+    """Test cases for real-time seat events."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.movie = Movie.objects.create(title="Test Movie", duration_minutes=120)
+        self.show = Show.objects.create(
+            movie=self.movie,
+            screen_name="Screen 1",
+            date_time=timezone.now() + timedelta(days=1),
+            total_seats=16,
+            price=250.00
+        )
+
+    def test_broadcaster_delivers_to_subscribers(self):
+        """Test that published events reach only the show's subscribers."""
+        broadcaster = events.InProcessBroadcaster()
+
+        async def scenario():
+            subscription = broadcaster.subscribe(1)
+            other = broadcaster.subscribe(2)
+            broadcaster.publish(1, {'type': 'booked', 'seats': [3]})
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=1)
+            broadcaster.unsubscribe(subscription)
+            broadcaster.unsubscribe(other)
+            return event, other.queue.empty()
+
+        event, other_empty = asyncio.run(scenario())
+        self.assertEqual(event['seats'], [3])
+        self.assertTrue(other_empty)
+        self.assertEqual(broadcaster.subscriber_count(), 0)
+
+    def test_committed_booking_is_published(self):
+        """Test that a booking publishes a delta after commit."""
+        broadcaster = mock.Mock()
+        with mock.patch('movies.events.get_broadcaster', return_value=broadcaster):
+            with self.captureOnCommitCallbacks(execute=True):
+                Booking.objects.create(user=self.user, show=self.show, seat_number=4)
+        broadcaster.publish.assert_called_once_with(self.show.id, {
+            'type': 'booked',
+            'show_id': self.show.id,
+            'seats': [4],
+            'available_seats': 15,
+        })
+
+    async def test_stream_starts_with_snapshot(self):
+        """Test that the event stream opens with the current seat bitmap."""
+        url = reverse('show-seat-events', kwargs={'show_id': self.show.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        chunks = aiter(response.streaming_content)
+        await anext(chunks)
+        snapshot = (await anext(chunks)).decode()
+        await chunks.aclose()
+        self.assertTrue(snapshot.startswith('event: snapshot\n'))
+        data = json.loads(snapshot.split('data: ', 1)[1])
+        self.assertEqual(data['available_seats'], 16)
+        self.assertEqual(data['seat_map'], 'AAA=')
+
+    async def test_stream_unknown_show(self):
+        """Test that streaming a missing show returns 404."""
+        url = reverse('show-seat-events', kwargs={'show_id': 9999})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_stream_requires_asgi(self):
+        """Test that WSGI requests are refused instead of holding the worker."""
+        url = reverse('show-seat-events', kwargs={'show_id': self.show.id})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+        self.assertIn('error', response.json())
+
+
+class AsyncCatalogueAPITest(TestCase):
+    """Test cases for the async catalogue read endpoints."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.movie = Movie.objects.create(title="Test Movie", duration_minutes=120)
+        for i in range(22):
+            show = Show.objects.create(
+                movie=self.movie,
+                screen_name=f"Screen {i}",
+                date_time=timezone.now() + timedelta(days=1, hours=i),
+                total_seats=50,
+                price=200.00
+            )
+        Booking.objects.create(user=self.user, show=show, seat_number=1)
+
+    async def test_async_show_list_matches_sync_format(self):
+        """Test that async show pages match the sync endpoint."""
+        response = await self.async_client.get(reverse('async-show-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['count'], 22)
+        self.assertEqual(len(data['results']), 20)
+        self.assertIsNone(data['previous'])
+        self.assertEqual(data['results'][0]['movie_title'], "Test Movie")
+
+        response = await self.async_client.get(data['next'])
+        data = response.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['results'][-1]['available_seats'], 49)
+
+        response = await self.async_client.get(reverse('async-show-list'), {'page': 9})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_movie_endpoints(self):
+        """Test async movie list, detail and shows."""
+        response = await self.async_client.get(reverse('async-movie-list'))
+        self.assertEqual(response.json()['results'][0]['shows_count'], 22)
+
+        url = reverse('async-movie-detail', kwargs={'pk': self.movie.id})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.json()['upcoming_shows_count'], 22)
+
+        url = reverse('async-movie-shows', kwargs={'movie_id': self.movie.id})
+        response = await self.async_client.get(url, {'seat_format': 'rle'})
+        self.assertEqual(response.json()['results'][0]['seat_map'], [50])
+
+        url = reverse('async-movie-shows', kwargs={'movie_id': 9999})
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@skipUnless(connection.vendor == 'sqlite', "SQLite not in use")
+class SQLiteProfileTest(TransactionTestCase):
+    """Test cases for the tuned SQLite connection profile."""
+    # Runs its own connections on a database file: the in-memory test
+    # database cannot use WAL
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'profile.sqlite3')
+        self.wrappers = []
+
+    def tearDown(self):
+        for wrapper in self.wrappers:
+            wrapper.close()
+        self.tmpdir.cleanup()
+
+    def connect(self, options, track=True):
+        """A connection to the test file with ``options``, closed on tearDown if ``track``."""
+        wrapper = SQLiteDatabaseWrapper(
+            {**connection.settings_dict, 'NAME': self.path, 'OPTIONS': options}, DEFAULT_DB_ALIAS
+        )
+        if track:
+            self.wrappers.append(wrapper)
+        return wrapper
+
+    def test_connection_pragmas(self):
+        """Test that tuned pragmas are applied on connect."""
+        with self.connect(settings.SQLITE_TUNED_OPTIONS).cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 20000)
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -32000)
+
+    def run_concurrent_writers(self, options):
+        """
+        Run two read-then-write transactions that overlap, the second
+        starting while the first holds the write lock; return their errors.
+        """
+        with self.connect(options).cursor() as cursor:
+            cursor.execute('CREATE TABLE IF NOT EXISTS seats (number INTEGER)')
+        first_writing = threading.Event()
+        errors = []
+
+        def writer(number, hold):
+            # Connections are per thread: this thread's default is the profile
+            connections[DEFAULT_DB_ALIAS] = self.connect(options, track=False)
+            try:
+                if not hold:
+                    first_writing.wait()
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.execute('SELECT COUNT(*) FROM seats')
+                    if hold:
+                        cursor.execute('INSERT INTO seats VALUES (%s)', [number])
+                        first_writing.set()
+                        time.sleep(0.3)
+                    else:
+                        cursor.execute('INSERT INTO seats VALUES (%s)', [number])
+            except OperationalError as exc:
+                errors.append(str(exc))
+            finally:
+                first_writing.set()
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(1, True)),
+                   threading.Thread(target=writer, args=(2, False))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def test_second_writer_waits_for_the_lock(self):
+        """Test that an overlapping writer queues instead of failing with "database is locked"."""
+        self.assertEqual(self.run_concurrent_writers(settings.SQLITE_TUNED_OPTIONS), [])
+        with self.connect({}).cursor() as cursor:
+            cursor.execute('SELECT number FROM seats ORDER BY number')
+            self.assertEqual(cursor.fetchall(), [(1,), (2,)])
+
+    def test_stock_profile_fails_on_lock_upgrade(self):
+        """Test that without the profile the same writers fail on the read-to-write upgrade."""
+        errors = self.run_concurrent_writers({'init_command': 'PRAGMA journal_mode=WAL;'})
+        self.assertEqual(len(errors), 1)
+        self.assertIn('database is locked', errors[0])
+
+
+@skipUnless(connection.vendor == 'postgresql', "PostgreSQL not in use")
+class PostgreSQLConnectionTest(TestCase):
+    """Test cases for the environment-driven PostgreSQL settings."""
+
+    def test_persistent_connections(self):
+        """Test that connections are reused and health-checked."""
+        if 'pool' not in connection.settings_dict['OPTIONS']:
+            self.assertGreater(connection.settings_dict['CONN_MAX_AGE'], 0)
+        self.assertTrue(connection.settings_dict['CONN_HEALTH_CHECKS'])
+
+    @override_settings(BOOKING_STATEMENT_TIMEOUT_MS=1500)
+    def test_booking_statement_timeout(self):
+        """Test that the booking transaction is bounded by the statement timeout."""
+        with transaction.atomic():
+            set_statement_timeout()
+            with connection.cursor() as cursor:
+                cursor.execute('SHOW statement_timeout')
+                self.assertEqual(cursor.fetchone()[0], '1500ms')
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            self.assertNotEqual(cursor.fetchone()[0], '1500ms')
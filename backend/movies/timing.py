@@ -0,0 +1,113 @@
+"""
+Per-request timing breakdown.
+
+``RequestTimings.activate`` starts measuring a request: it makes the timings
+current for the request's context and wraps every database connection so
+each query's duration and SQL are recorded. Code anywhere in the request can
+add named spans with ``record`` or ``span`` without access to the request;
+both are no-ops outside a timed request. ``RequestTimingMiddleware`` reports
+the result.
+"""
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Total, database and named span durations of one request, in seconds.
+    """
+
+    def __init__(self, max_queries=50):
+        self.max_queries = max_queries
+        self.total = 0.0
+        self.db_time = 0.0
+        self.query_count = 0
+        self.queries = []
+        self.spans = {}
+
+    def record(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper: time the query and keep its SQL."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.query_count += 1
+            if len(self.queries) < self.max_queries:
+                self.queries.append({'sql': sql, 'ms': round(duration * 1000, 3)})
+
+    @contextmanager
+    def activate(self):
+        """Time the enclosed block as this request."""
+        token = _current.set(self)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            self.total = time.perf_counter() - started
+            _current.reset(token)
+
+
+def current():
+    """The timings of the request being handled, or ``None``."""
+    return _current.get()
+
+
+def record(name, seconds):
+    """Add ``seconds`` to a named span of the current request."""
+    timings = _current.get()
+    if timings is not None:
+        timings.record(name, seconds)
+
+
+@contextmanager
+def span(name):
+    """Add the duration of the enclosed block to a named span."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+class TimedSerializer:
+    """Proxy for a serializer that records reading its ``data`` as the ``serialize`` span."""
+
+    def __init__(self, serializer):
+        self._serializer = serializer
+
+    @property
+    def data(self):
+        with span('serialize'):
+            return self._serializer.data
+
+    def __getattr__(self, name):
+        return getattr(self._serializer, name)
+
+
+class TimedListMixin:
+    """
+    Record building a DRF list response body as the ``serialize`` span.
+
+    DRF's own ``list`` is kept; only the list serializer it gets is wrapped.
+    Paginated pages are fetched before serialization, an unpaginated
+    queryset during it.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if kwargs.get('many'):
+            return TimedSerializer(serializer)
+        return serializer
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Authentication endpoints
@@ -8,14 +8,27 @@ urlpatterns = [
     
     # Movie endpoints
     path('movies/', views.MovieListView.as_view(), name='movie-list'),
+    path('movies/search/', views.MovieSearchView.as_view(), name='movie-search'),
     path('movies/<int:pk>/', views.MovieDetailView.as_view(), name='movie-detail'),
+    path('movies/<int:pk>/page/', views.MoviePageView.as_view(), name='movie-page'),
     path('movies/<int:movie_id>/shows/', views.MovieShowsView.as_view(), name='movie-shows'),
     
     # Show endpoints
     path('shows/', views.ShowListCreateView.as_view(), name='show-list'),
+    path('shows/availability/', views.show_availability, name='show-availability'),
+    path('shows/calendar/', views.ShowCalendarView.as_view(), name='show-calendar'),
     path('shows/<int:show_id>/book/', views.book_seat, name='book-seat'),
+    path('shows/<int:show_id>/book-batch/', views.book_seats_batch, name='book-seats-batch'),
+    path('shows/<int:show_id>/events/', views.show_seat_events, name='show-seat-events'),
+    
+    # Async catalogue reads (for ASGI deployments)
+    path('async/movies/', async_views.movie_list, name='async-movie-list'),
+    path('async/movies/<int:pk>/', async_views.movie_detail, name='async-movie-detail'),
+    path('async/movies/<int:movie_id>/shows/', async_views.movie_shows, name='async-movie-shows'),
+    path('async/shows/', async_views.show_list, name='async-show-list'),
     
     # Booking endpoints
+    path('bookings/export/', views.export_bookings, name='export-bookings'),
     path('bookings/<int:booking_id>/cancel/', views.cancel_booking, name='cancel-booking'),
     path('my-bookings/', views.UserBookingsView.as_view(), name='user-bookings'),
     
@@ -1,19 +1,44 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, time, timedelta
+
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import transaction, IntegrityError, DatabaseError, OperationalError
-import time
-from django.shortcuts import get_object_or_404
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from django.db import transaction, DatabaseError
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.http import quote_etag
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from . import booking, events, export, search, seatmap, timing
+from .retry import RetriesExhausted, booking_retry_policy
+from .routers import ReplicaReadMixin, stick_to_primary
 from .models import Movie, Show, Booking
+from .cache import CachedListMixin, get_availability, strip_seats
+from .pagination import (
+    BookingCursorPagination, CursorPaginationOptInMixin, ShowCursorPagination
+)
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, MovieSerializer,
-    ShowSerializer, BookingSerializer, SeatBookingSerializer, UserProfileSerializer
+    ShowSerializer, BookingSerializer, SeatBookingSerializer, BatchSeatBookingSerializer,
+    UserProfileSerializer
+)
+
+
+CURSOR_PAGINATION_PARAM = openapi.Parameter(
+    'pagination', openapi.IN_QUERY,
+    description="Set to 'cursor' for keyset pagination (follow the next/previous links)",
+    type=openapi.TYPE_STRING, enum=['cursor']
 )
 
 
@@ -87,11 +112,11 @@ class UserLoginView(generics.GenericAPIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MovieListView(generics.ListCreateAPIView):
+class MovieListView(ReplicaReadMixin, CachedListMixin, generics.ListCreateAPIView):
     """
     List all movies or create a new movie.
     """
-    queryset = Movie.objects.all()
+    queryset = Movie.objects.with_show_counts().order_by('-created_at')
     serializer_class = MovieSerializer
     
     def get_permissions(self):
@@ -115,11 +140,52 @@ class MovieListView(generics.ListCreateAPIView):
         return super().post(request, *args, **kwargs)
 
 
-class MovieDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MovieSearchView(ReplicaReadMixin, CachedListMixin, generics.ListAPIView):
+    """
+    Full-text movie search with genre, rating and release date filters.
+    """
+    serializer_class = MovieSerializer
+    permission_classes = [AllowAny]
+    cache_query_params = ('q', 'genre', 'rating_min', 'rating_max', 'released_from', 'released_to')
+
+    def get_queryset(self):
+        params = self.request.query_params
+        queryset = search.apply_filters(Movie.objects.with_show_counts(), params)
+        if search.search_terms(params.get('q', '')):
+            return search.search(queryset, params['q'])
+        return queryset.order_by('-release_date', 'id')
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        try:
+            return super().get_uncached_response(request, *args, **kwargs)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_description="Search movies by title, description and genre, best matches first. "
+                              "Every word must match (as a prefix). Without q, matching movies are "
+                              "listed newest release first.",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, description="Search text", type=openapi.TYPE_STRING),
+            openapi.Parameter('genre', openapi.IN_QUERY, description="Exact genre", type=openapi.TYPE_STRING),
+            openapi.Parameter('rating_min', openapi.IN_QUERY, description="Minimum rating", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('rating_max', openapi.IN_QUERY, description="Maximum rating", type=openapi.TYPE_NUMBER),
+            openapi.Parameter('released_from', openapi.IN_QUERY, description="Earliest release date (YYYY-MM-DD)",
+                              type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+            openapi.Parameter('released_to', openapi.IN_QUERY, description="Latest release date (YYYY-MM-DD)",
+                              type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+        ],
+        responses={200: MovieSerializer(many=True), 400: "Invalid filter"}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
+class MovieDetailView(ReplicaReadMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update or delete a movie.
     """
-    queryset = Movie.objects.all()
+    queryset = Movie.objects.with_show_counts().order_by('-created_at')
     serializer_class = MovieSerializer
     
     def get_permissions(self):
@@ -129,29 +195,115 @@ class MovieDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [IsAdminUser()]
 
 
-class MovieShowsView(generics.ListAPIView):
+class MovieShowsView(ReplicaReadMixin, CachedListMixin, CursorPaginationOptInMixin, generics.ListAPIView):
     """
     List all shows for a specific movie.
     """
     serializer_class = ShowSerializer
+    cursor_pagination_class = ShowCursorPagination
+    cache_show_seats = True
     permission_classes = [AllowAny]
 
     def get_queryset(self):
         movie_id = self.kwargs['movie_id']
-        return Show.objects.filter(movie_id=movie_id).order_by('date_time')
+        return Show.objects.for_listing().filter(movie_id=movie_id).order_by('date_time')
+
+    def get_cache_namespaces(self):
+        return [f"movie:{self.kwargs['movie_id']}"]
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        movie_id = self.kwargs['movie_id']
+        if not Movie.objects.filter(id=movie_id).exists():
+            return Response(
+                {'error': 'Movie not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return super().get_uncached_response(request, *args, **kwargs)
 
     @swagger_auto_schema(
         operation_description="Get all shows for a specific movie",
+        manual_parameters=[CURSOR_PAGINATION_PARAM],
         responses={200: ShowSerializer(many=True), 404: "Movie not found"}
     )
     def get(self, request, *args, **kwargs):
-        movie_id = self.kwargs['movie_id']
-        if not Movie.objects.filter(id=movie_id).exists():
+        return super().get(request, *args, **kwargs)
+
+
+class MoviePageView(ReplicaReadMixin, CachedListMixin, generics.GenericAPIView):
+    """
+    Everything a movie page shows in one response: the movie, its upcoming
+    shows and each show's availability.
+
+    Costs two queries when not cached. The cached copy is keyed by the
+    movie's version and, as for show lists, each show's availability is
+    overlaid from its seat entry, so bookings never evict the page.
+    """
+    serializer_class = ShowSerializer
+    pagination_class = None
+    cache_show_seats = True
+    permission_classes = [AllowAny]
+
+    def get_cache_namespaces(self):
+        return [f"movie:{self.kwargs['pk']}"]
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        try:
+            movie = Movie.objects.with_show_counts().get(pk=self.kwargs['pk'])
+        except Movie.DoesNotExist:
             return Response(
-                {'error': 'Movie not found'}, 
+                {'error': 'Movie not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
-        return super().get(request, *args, **kwargs)
+        # Run the query first so the serialize span covers serialization only
+        shows = list(
+            Show.objects.for_listing()
+            .filter(movie=movie, date_time__gte=timezone.now())
+            .order_by('date_time', 'id')[:getattr(settings, 'MOVIE_PAGE_MAX_SHOWS', 50)]
+        )
+        # The list serializer from get_serializer() is timed already
+        return Response({
+            'movie': timing.TimedSerializer(
+                MovieSerializer(movie, context=self.get_serializer_context())
+            ).data,
+            'shows': self.get_serializer(shows, many=True).data,
+        })
+
+    def get_items(self, data):
+        return data['shows']
+
+    def to_shell(self, data):
+        return {**data, 'shows': strip_seats(data['shows'])}
+
+    @swagger_auto_schema(
+        operation_description="Get a movie with its upcoming shows and their seat availability "
+                              "(at most MOVIE_PAGE_MAX_SHOWS shows; the movie's "
+                              "upcoming_shows_count tells whether there are more)",
+        responses={200: "Movie and upcoming shows", 404: "Movie not found"}
+    )
+    def get(self, request, *args, **kwargs):
+        response = self.list(request, *args, **kwargs)
+        if response.status_code == 200:
+            # A cached page may list shows that have started since
+            now = timezone.now()
+            response.data['shows'] = [
+                show for show in response.data['shows'] if parse_datetime(show['date_time']) >= now
+            ]
+        return response
+
+
+def booking_busy_response(exc):
+    """
+    503 response for a booking that kept hitting transient errors.
+
+    The client is told when to retry instead of the worker sleeping on its
+    behalf.
+    """
+    response = Response(
+        {'error': 'The show is busy right now. Please try again shortly.'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = str(exc.retry_after)
+    return response
 
 
 @swagger_auto_schema(
@@ -171,7 +323,8 @@ class MovieShowsView(generics.ListAPIView):
             }
         ),
         400: "Validation error or seat already booked",
-        404: "Show not found"
+        404: "Show not found",
+        503: "Show busy; retry after the Retry-After interval"
     }
 )
 @api_view(['POST'])
@@ -179,81 +332,139 @@ class MovieShowsView(generics.ListAPIView):
 def book_seat(request, show_id):
     """
     Book a seat for a specific show.
+
+    Transient database errors are retried by the booking retry policy;
+    seat conflicts are returned immediately.
     """
-    MAX_ATTEMPTS = 3
-    BACKOFF_SECONDS = 0.1
+    def attempt():
+        # Load (and, with the locking strategy, lock) the show once;
+        # validation, the insert and the response all reuse it
+        with booking.booking_transaction(show_id) as locked_show:
+
+            serializer = SeatBookingSerializer(
+                data=request.data,
+                context={'show': locked_show}
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-    show = get_object_or_404(Show, id=show_id)
+            new_booking = serializer.save(user=request.user)
+            stick_to_primary(request.user)
 
-    serializer = SeatBookingSerializer(
-        data=request.data,
-        context={'show_id': show_id, 'user': request.user}
-    )
+            return Response({
+                'message': 'Seat booked successfully',
+                'booking_id': new_booking.id,
+                'seat_number': new_booking.seat_number,
+                'show_id': locked_show.id,
+                'movie_title': locked_show.movie.title,
+                'show_datetime': locked_show.date_time,
+                'screen_name': locked_show.screen_name
+            }, status=status.HTTP_201_CREATED)
 
-    if not serializer.is_valid():
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return booking_retry_policy().run(attempt)
+    except booking.SeatsUnavailable:
+        return Response(
+            {'error': 'Seat already booked'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except RetriesExhausted as exc:
+        return booking_busy_response(exc)
+    except Show.DoesNotExist:
+        return Response(
+            {'error': 'Show not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except DatabaseError:
+        return Response(
+            {'error': 'Could not complete booking due to a database error. Please try again.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    except Exception:
+        return Response(
+            {'error': 'An error occurred while booking the seat'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
-    seat_number = serializer.validated_data['seat_number']
 
-    last_exc = None
-    for attempt in range(1, MAX_ATTEMPTS + 1):
-        try:
-            with transaction.atomic():
-                # Lock the show row to avoid concurrent seat checks
-                locked_show = Show.objects.select_for_update().get(id=show_id)
-
-                # Double-check seat availability inside the transaction
-                existing_booking = Booking.objects.filter(
-                    show=locked_show,
-                    seat_number=seat_number,
-                    status='booked'
-                ).exists()
-
-                if existing_booking:
-                    return Response(
-                        {'error': 'Seat already booked'},
-                        status=status.HTTP_400_BAD_REQUEST
-                    )
-
-                # Create booking
-                booking = Booking.objects.create(
-                    user=request.user,
-                    show=locked_show,
-                    seat_number=seat_number,
-                    status='booked'
-                )
+@swagger_auto_schema(
+    method='post',
+    operation_description="Book several seats for a show in one all-or-nothing request",
+    request_body=BatchSeatBookingSerializer,
+    responses={
+        201: openapi.Response(
+            description="Seats booked successfully",
+            examples={
+                "application/json": {
+                    "message": "3 seats booked successfully",
+                    "booking_ids": [1, 2, 3],
+                    "seat_numbers": [4, 5, 6],
+                    "show_id": 1
+                }
+            }
+        ),
+        400: "Validation error or one or more seats already booked",
+        404: "Show not found",
+        503: "Show busy; retry after the Retry-After interval"
+    }
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def book_seats_batch(request, show_id):
+    """
+    Book several seats for a specific show atomically.
 
-                return Response({
-                    'message': 'Seat booked successfully',
-                    'booking_id': booking.id,
-                    'seat_number': booking.seat_number,
-                    'show_id': locked_show.id,
-                    'movie_title': locked_show.movie.title,
-                    'show_datetime': locked_show.date_time,
-                    'screen_name': locked_show.screen_name
-                }, status=status.HTTP_201_CREATED)
-
-        except (IntegrityError, OperationalError, DatabaseError) as exc:
-            # Record last exception and retry with backoff for transient DB errors
-            last_exc = exc
-            if attempt < MAX_ATTEMPTS:
-                time.sleep(BACKOFF_SECONDS * attempt)
-                continue
-            else:
-                return Response(
-                    {'error': 'Could not complete booking due to a database error. Please try again.'},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        except Show.DoesNotExist:
-            return Response(
-                {'error': 'Show not found'}, 
-                status=status.HTTP_404_NOT_FOUND
-            )
-        except Exception:
-            return Response(
-                {'error': 'An error occurred while booking the seat'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+    Either every requested seat is booked or none is: availability is checked
+    against the show's seat bitmap and all bookings are inserted with one
+    bulk insert in a single transaction.
+    """
+    def attempt():
+        # Load (and, with the locking strategy, lock) the show once for
+        # the whole group of seats
+        with booking.booking_transaction(show_id) as locked_show:
+
+            serializer = BatchSeatBookingSerializer(
+                data=request.data,
+                context={'show': locked_show}
             )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            bookings = serializer.save(user=request.user)
+            stick_to_primary(request.user)
+
+            return Response({
+                'message': f'{len(bookings)} seats booked successfully',
+                'booking_ids': [new_booking.id for new_booking in bookings],
+                'seat_numbers': [new_booking.seat_number for new_booking in bookings],
+                'show_id': locked_show.id,
+                'movie_title': locked_show.movie.title,
+                'show_datetime': locked_show.date_time,
+                'screen_name': locked_show.screen_name
+            }, status=status.HTTP_201_CREATED)
+
+    try:
+        return booking_retry_policy().run(attempt)
+    except booking.SeatsUnavailable as exc:
+        return Response(
+            {
+                'error': 'One or more seats are already booked',
+                'unavailable_seats': exc.seat_numbers
+            },
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except RetriesExhausted as exc:
+        return booking_busy_response(exc)
+    except Show.DoesNotExist:
+        return Response(
+            {'error': 'Show not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except DatabaseError:
+        return Response(
+            {'error': 'Could not complete booking due to a database error. Please try again.'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
 
 
 @swagger_auto_schema(
@@ -281,31 +492,47 @@ def cancel_booking(request, booking_id):
     Cancel a booking. Users can only cancel their own bookings.
     """
     try:
-        booking = get_object_or_404(Booking, id=booking_id)
-        
+        # Check ownership and status with a plain read, so requests that will
+        # be refused never queue for the show's lock
+        booking = Booking.objects.only('user_id', 'show_id', 'status').get(id=booking_id)
+
         # Check if user owns this booking
-        if booking.user != request.user:
+        if booking.user_id != request.user.id:
             return Response(
                 {'error': 'You can only cancel your own bookings'},
                 status=status.HTTP_403_FORBIDDEN
             )
-        
+
         # Check if booking is already cancelled
         if booking.status == 'cancelled':
             return Response(
                 {'error': 'Booking is already cancelled'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        
-        # Cancel the booking
-        booking.status = 'cancelled'
-        booking.save()
+
+        # Lock the show, then re-read the booking under its own row lock, so
+        # the status check sees the row this request updates
+        with transaction.atomic():
+            show = Show.objects.select_for_update().get(id=booking.show_id)
+            booking = Booking.objects.select_for_update().get(id=booking_id)
+
+            # A concurrent request may have cancelled it since the check above
+            if booking.status == 'cancelled':
+                return Response(
+                    {'error': 'Booking is already cancelled'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            booking.show = show
+            booking.status = 'cancelled'
+            booking.save(show_locked=True)
+        stick_to_primary(request.user)
         
         return Response({
             'message': 'Booking cancelled successfully',
             'booking_id': booking.id,
             'seat_number': booking.seat_number,
-            'show_id': booking.show.id
+            'show_id': booking.show_id
         }, status=status.HTTP_200_OK)
         
     except Booking.DoesNotExist:
@@ -315,30 +542,216 @@ def cancel_booking(request, booking_id):
         )
 
 
-class UserBookingsView(generics.ListAPIView):
+def served_by_asgi(request):
+    """Whether a Django or REST framework request came in through ASGI rather than WSGI."""
+    # Every WSGI environ carries wsgi.input; ASGI requests have no such key
+    return 'wsgi.input' not in request.META
+
+
+EXPORT_PARAMETERS = [
+    openapi.Parameter('output', openapi.IN_QUERY, description="Output format (default csv)",
+                      type=openapi.TYPE_STRING, enum=list(export.FORMATS)),
+    openapi.Parameter('show', openapi.IN_QUERY, description="Show id", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('movie', openapi.IN_QUERY, description="Movie id", type=openapi.TYPE_INTEGER),
+    openapi.Parameter('date_from', openapi.IN_QUERY, description="First booking date (YYYY-MM-DD)",
+                      type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+    openapi.Parameter('date_to', openapi.IN_QUERY, description="Last booking date (YYYY-MM-DD)",
+                      type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+    openapi.Parameter('status', openapi.IN_QUERY, description="Booking status",
+                      type=openapi.TYPE_STRING, enum=[choice for choice, _ in Booking.STATUS_CHOICES]),
+]
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Stream bookings as CSV or NDJSON for reporting (staff only)",
+    manual_parameters=EXPORT_PARAMETERS,
+    responses={
+        200: "CSV or NDJSON stream, one booking per row",
+        400: "Invalid filter or output format",
+        403: "Staff access required"
+    }
+)
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_bookings(request):
+    """
+    Stream bookings matching the filters, oldest first.
+
+    Rows come from a chunked ``values()`` iterator over the joined user,
+    show and movie columns, so memory stays flat for any number of rows.
+    Under ASGI the rows are read with ``aiterator()``, because a synchronous
+    iterator would be consumed in full before the first byte is sent.
+    """
+    export_format = request.query_params.get('output', 'csv')
+    if export_format not in export.FORMATS:
+        return Response(
+            {'error': f"output must be one of: {', '.join(export.FORMATS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        filters = export.parse_filters(request.query_params)
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = export.export_queryset(**filters)
+    chunk_size = export.get_chunk_size()
+    if served_by_asgi(request):
+        content = export.astream(rows.aiterator(chunk_size=chunk_size), export_format)
+    else:
+        content = export.stream(rows.iterator(chunk_size=chunk_size), export_format)
+
+    response = StreamingHttpResponse(content, content_type=export.FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="bookings.{export_format}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
+@require_GET
+async def show_seat_events(request, show_id):
+    """
+    Stream seat availability changes for a show as Server-Sent Events.
+
+    The stream opens with a ``snapshot`` event carrying the current seat
+    bitmap (base64) and then sends ``booked``/``cancelled`` deltas as
+    bookings commit. Comment lines keep idle connections alive. Only served
+    through ASGI: a WSGI server would try to read the endless stream to the
+    end before sending anything, tying up the worker for good.
+    """
+    if not served_by_asgi(request):
+        return JsonResponse(
+            {'error': 'Seat events are only available when the server runs under ASGI.'},
+            status=status.HTTP_501_NOT_IMPLEMENTED
+        )
+
+    broadcaster = events.get_broadcaster()
+    # Subscribe before reading the snapshot so no delta falls in between
+    subscription = broadcaster.subscribe(show_id)
+    try:
+        show = await Show.objects.only('id', 'total_seats', 'seat_map').aget(id=show_id)
+    except Show.DoesNotExist:
+        broadcaster.unsubscribe(subscription)
+        return JsonResponse({'error': 'Show not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    heartbeat = getattr(settings, 'SEAT_EVENTS_HEARTBEAT_SECONDS', 15)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            yield events.format_event('snapshot', {
+                'show_id': show.id,
+                'total_seats': show.total_seats,
+                'available_seats': show.available_seats,
+                'seat_map': seatmap.to_base64(show.seat_map, show.total_seats),
+            })
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield events.format_event(event['type'], event)
+                if subscription.overflowed:
+                    yield events.format_event('resync', {'show_id': show.id})
+                    subscription.overflowed = False
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def parse_show_ids(value):
+    """Parse a comma-separated list of show ids, keeping the first occurrence of each."""
+    try:
+        show_ids = list(dict.fromkeys(int(show_id) for show_id in value.split(',') if show_id.strip()))
+    except ValueError:
+        raise ValueError('ids must be a comma-separated list of show ids.')
+    if not show_ids:
+        raise ValueError('ids is required.')
+    max_ids = getattr(settings, 'SHOW_AVAILABILITY_MAX_IDS', 100)
+    if len(show_ids) > max_ids:
+        raise ValueError(f'At most {max_ids} show ids can be requested at once.')
+    return show_ids
+
+
+@swagger_auto_schema(
+    method='get',
+    operation_description="Get seat availability for several shows at once. Shows that do not "
+                          "exist are left out. Send the ETag back in If-None-Match to get a 304 "
+                          "when nothing changed.",
+    manual_parameters=[
+        openapi.Parameter('ids', openapi.IN_QUERY, description="Comma-separated show ids",
+                          type=openapi.TYPE_STRING, required=True),
+    ],
+    responses={
+        200: openapi.Response(
+            description="Availability by show id",
+            examples={
+                "application/json": {
+                    "1": {"available": 48, "total": 50, "sold_out": False},
+                    "2": {"available": 0, "total": 120, "sold_out": True}
+                }
+            }
+        ),
+        304: "Not modified",
+        400: "Invalid ids"
+    }
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def show_availability(request):
+    """
+    Availability of many shows from the per-show seat entries.
+
+    Cached entries cost no query; the rest are loaded together in one.
+    """
+    try:
+        show_ids = parse_show_ids(request.query_params.get('ids', ''))
+    except ValueError as exc:
+        return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    availability = get_availability(show_ids)
+    data = {str(show_id): availability[show_id] for show_id in show_ids if show_id in availability}
+    etag = quote_etag(hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest())
+
+    response = get_conditional_response(request, etag=etag) or Response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+class UserBookingsView(ReplicaReadMixin, CursorPaginationOptInMixin, timing.TimedListMixin,
+                       generics.ListAPIView):
     """
     List all bookings for the authenticated user.
     """
     serializer_class = BookingSerializer
+    cursor_pagination_class = BookingCursorPagination
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return Booking.objects.filter(user=self.request.user).order_by('-created_at')
+        return Booking.objects.for_listing().filter(user=self.request.user).order_by('-created_at')
 
     @swagger_auto_schema(
         operation_description="Get all bookings for the authenticated user",
+        manual_parameters=[CURSOR_PAGINATION_PARAM],
         responses={200: BookingSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
-class ShowListCreateView(generics.ListCreateAPIView):
+class ShowListCreateView(ReplicaReadMixin, CachedListMixin, CursorPaginationOptInMixin, generics.ListCreateAPIView):
     """
     List all shows or create a new show.
     """
-    queryset = Show.objects.all()
+    queryset = Show.objects.for_listing()
     serializer_class = ShowSerializer
+    cursor_pagination_class = ShowCursorPagination
+    cache_show_seats = True
     
     def get_permissions(self):
         """Allow GET for everyone, POST only for admin users."""
@@ -348,12 +761,131 @@ class ShowListCreateView(generics.ListCreateAPIView):
 
     @swagger_auto_schema(
         operation_description="Get list of all shows",
+        manual_parameters=[CURSOR_PAGINATION_PARAM],
         responses={200: ShowSerializer(many=True)}
     )
     def get(self, request, *args, **kwargs):
         return super().get(request, *args, **kwargs)
 
 
+def parse_calendar_bound(value, name, end=False):
+    """
+    Parse a calendar window bound given as an ISO date or datetime.
+
+    Dates and naive datetimes are taken in the current time zone; a date
+    used as the ``end`` bound includes that whole day.
+    """
+    try:
+        day = parse_date(value)
+        parsed = None if day else parse_datetime(value)
+    except ValueError:
+        parsed = day = None
+    if day is not None:
+        parsed = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if parsed is None:
+        raise ValueError(f'{name} must be an ISO date (YYYY-MM-DD) or datetime.')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ShowCalendarView(ReplicaReadMixin, CachedListMixin, generics.ListAPIView):
+    """
+    Shows in a time window grouped by day, one day per page.
+
+    ``days`` lists every day in the window with its show count, from a
+    single aggregate query; ``results`` holds the shows of the selected day
+    only, paginated. The window defaults to seven days from the start of
+    today and is limited to ``SHOW_CALENDAR_MAX_DAYS``.
+    """
+    serializer_class = ShowSerializer
+    cache_show_seats = True
+    cache_query_params = ('start', 'end', 'screen', 'movie', 'day')
+    permission_classes = [AllowAny]
+
+    def get_window(self):
+        params = self.request.query_params
+        if params.get('start'):
+            start = parse_calendar_bound(params['start'], 'start')
+        else:
+            start = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        if params.get('end'):
+            end = parse_calendar_bound(params['end'], 'end', end=True)
+        else:
+            end = start + timedelta(days=7)
+        if end <= start:
+            raise ValueError('end must be after start.')
+        max_days = getattr(settings, 'SHOW_CALENDAR_MAX_DAYS', 31)
+        if end - start > timedelta(days=max_days):
+            raise ValueError(f'The window cannot be longer than {max_days} days.')
+        return start, end
+
+    def get_window_queryset(self):
+        params = self.request.query_params
+        queryset = Show.objects.in_window(self.start, self.end)
+        if params.get('screen'):
+            queryset = queryset.filter(screen_name=params['screen'])
+        if params.get('movie'):
+            try:
+                queryset = queryset.filter(movie_id=int(params['movie']))
+            except ValueError:
+                raise ValueError('movie must be an integer id.')
+        return queryset
+
+    def get_queryset(self):
+        if self.day is None:
+            return Show.objects.none()
+        day_start = timezone.make_aware(datetime.combine(self.day, time.min))
+        return (
+            self.get_window_queryset().for_listing()
+            .in_window(max(day_start, self.start), min(day_start + timedelta(days=1), self.end))
+            .order_by('date_time', 'id')
+        )
+
+    def get_uncached_response(self, request, *args, **kwargs):
+        try:
+            self.start, self.end = self.get_window()
+            days = [
+                {'date': row['day'], 'count': row['count']}
+                for row in self.get_window_queryset().day_counts()
+            ]
+            if request.query_params.get('day'):
+                self.day = timezone.localdate(parse_calendar_bound(request.query_params['day'], 'day'))
+            else:
+                self.day = days[0]['date'] if days else None
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response = super().get_uncached_response(request, *args, **kwargs)
+        response.data = {
+            'start': self.start,
+            'end': self.end,
+            'days': days,
+            'day': self.day,
+            **response.data,
+        }
+        return response
+
+    @swagger_auto_schema(
+        operation_description="Get shows in a time window grouped by day: per-day show counts "
+                              "for the whole window and the shows of one day",
+        manual_parameters=[
+            openapi.Parameter('start', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Window start, ISO date or datetime (default: start of today)"),
+            openapi.Parameter('end', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Window end, ISO date (inclusive) or datetime "
+                                          "(default: start + 7 days)"),
+            openapi.Parameter('screen', openapi.IN_QUERY, description="Screen name", type=openapi.TYPE_STRING),
+            openapi.Parameter('movie', openapi.IN_QUERY, description="Movie id", type=openapi.TYPE_INTEGER),
+            openapi.Parameter('day', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE,
+                              description="Day whose shows to return (default: first day with shows)"),
+        ],
+        responses={200: ShowSerializer(many=True), 400: "Invalid window or filter"}
+    )
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     """
     Get or update user profile.
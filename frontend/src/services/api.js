@@ -471,33 +471,8 @@ class ApiService {
       return this.getMockResponse({ bookings, message: `Successfully booked ${seatNumbers.length} seats` });
     }
 
-    // Book multiple seats sequentially with retry logic
-    const results = [];
-    const errors = [];
-
-    for (const seatNumber of seatNumbers) {
-      try {
-        const result = await this.bookSeat(showId, seatNumber);
-        results.push({
-          seatNumber,
-          success: true,
-          booking: result.data,
-        });
-      } catch (error) {
-        errors.push({
-          seatNumber,
-          success: false,
-          error: error.response?.data?.error || 'Booking failed',
-        });
-      }
-    }
-
-    return {
-      results,
-      errors,
-      successCount: results.length,
-      errorCount: errors.length,
-    };
+    // Book all seats in one all-or-nothing request
+    return this.api.post(`/shows/${showId}/book-batch/`, { seat_numbers: seatNumbers });
   }
 
   async getMyBookings() {